@@ -222,10 +222,10 @@ class RunHistoryResponse(BaseModel):
 
 
 @contextmanager
-def _get_connection():
-    """Get a DuckDB connection (serialized for stability)."""
+def _get_connection(write: bool = False):
+    """Get a pooled DuckDB connection; ``write`` serializes it with other writers."""
     settings = get_settings()
-    with connect_warehouse(settings.duckdb.path) as conn:
+    with connect_warehouse(settings.duckdb.path, write=write) as conn:
         yield conn
 
 
@@ -404,7 +404,7 @@ def execute_analysis(
     """Compile and execute an analysis."""
     service = get_asset_service(project_id)
 
-    with _get_connection() as conn:
+    with _get_connection(write=True) as conn:
         try:
             result = service.run_analysis(
                 analysis_id,
@@ -4,9 +4,21 @@ from __future__ import annotations
 
 import json
 import logging
+import re
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status, Header, Response
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
 from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field
 
@@ -20,6 +32,9 @@ from pluto_duck_backend.app.services.boards import (
 router = APIRouter(prefix="/boards", tags=["boards"])
 logger = logging.getLogger("pluto_duck_backend.boards")
 
+# Uploaded assets are stored as <sha256><ext>, so the name doubles as a strong ETag
+_CONTENT_DIGEST_RE = re.compile(r"[0-9a-f]{64}")
+
 
 def _settings_size(settings: Optional[Dict[str, Any]]) -> int:
     if settings is None:
@@ -483,6 +498,7 @@ def create_query(
 async def execute_query(
     item_id: str,
     project_id: str = Header(..., alias="X-Project-ID"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum rows to return"),
     service: BoardsService = Depends(get_service),
     repo: BoardsRepository = Depends(get_repo),
 ) -> QueryResultResponse:
@@ -492,7 +508,7 @@ async def execute_query(
         raise HTTPException(status_code=404, detail="Query not found for this item")
 
     try:
-        result = await service.execute_query(query.id, project_id)
+        result = await service.execute_query(query.id, project_id, limit=limit)
         return QueryResultResponse(
             columns=result["columns"],
             data=result["data"],
@@ -508,6 +524,7 @@ async def execute_query(
 @router.get("/items/{item_id}/query/result", response_model=QueryResultResponse)
 async def get_cached_result(
     item_id: str,
+    limit: Optional[int] = Query(None, ge=1, description="Maximum rows to return"),
     service: BoardsService = Depends(get_service),
     repo: BoardsRepository = Depends(get_repo),
 ) -> QueryResultResponse:
@@ -516,7 +533,7 @@ async def get_cached_result(
     if not query:
         raise HTTPException(status_code=404, detail="Query not found for this item")
 
-    result = await service.get_cached_result(query.id)
+    result = await service.get_cached_result(query.id, limit=limit)
     if not result:
         raise HTTPException(status_code=404, detail="No cached result available")
 
@@ -558,19 +575,33 @@ async def upload_asset(
 @router.get("/assets/{asset_id}/download")
 async def download_asset(
     asset_id: str,
+    request: Request,
     service: BoardsService = Depends(get_service),
-) -> FileResponse:
-    """Download an asset file."""
+) -> Response:
+    """Download an asset file.
+
+    FileResponse streams the file with sendfile where available; content-addressed
+    assets also answer conditional GETs with 304 Not Modified.
+    """
     try:
         file_path, mime_type = await service.download_asset(asset_id)
-        return FileResponse(
-            path=str(file_path),
-            media_type=mime_type,
-            filename=file_path.name,
-        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+    headers: Dict[str, str] = {}
+    if _CONTENT_DIGEST_RE.fullmatch(file_path.stem):
+        etag = f'"{file_path.stem}"'
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        headers["ETag"] = etag
+
+    return FileResponse(
+        path=str(file_path),
+        media_type=mime_type,
+        filename=file_path.name,
+        headers=headers,
+    )
+
 
 @router.delete("/assets/{asset_id}", status_code=status.HTTP_204_NO_CONTENT, response_class=Response)
 def delete_asset_endpoint(
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 
 from pluto_duck_backend.app.services.projects import ProjectRepository, get_project_repository
 
-router = APIRouter(prefix="/projects", tags=["projects"])
+# Responses are validated against each route's response_model, then encoded with orjson
+router = APIRouter(
+    prefix="/projects", tags=["projects"], default_response_class=ORJSONResponse
+)
 
 
 class ProjectResponse(BaseModel):
@@ -23,7 +27,7 @@ class ProjectListResponse(BaseModel):
     description: Optional[str]
     created_at: Optional[str]
     updated_at: Optional[str]
-    settings: Dict[str, Any]
+    settings: Optional[Dict[str, Any]] = None
     is_default: bool
     board_count: int
     conversation_count: int
@@ -39,26 +43,28 @@ class UpdateProjectSettingsRequest(BaseModel):
     preferences: Optional[Dict[str, Any]] = None
 
 
-@router.get("", response_model=List[ProjectListResponse])
+@router.get("", response_model=List[ProjectListResponse], response_model_exclude_unset=True)
 def list_projects(
+    include_settings: bool = Query(
+        True, description="Include each project's settings document"
+    ),
     repo: ProjectRepository = Depends(get_project_repository),
-) -> List[ProjectListResponse]:
+) -> List[Dict[str, Any]]:
     """List all projects with metadata."""
-    projects = repo.list_projects()
-    return [ProjectListResponse(**project) for project in projects]
+    return repo.list_projects(include_settings=include_settings)
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
 def get_project(
     project_id: str,
     repo: ProjectRepository = Depends(get_project_repository),
-) -> ProjectResponse:
+) -> Dict[str, Any]:
     """Get project details by ID."""
     project = repo.get_project(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    return ProjectResponse(**project)
+    return project
 
 
 @router.post("", response_model=ProjectResponse)
@@ -11,6 +11,7 @@ from pydantic import BaseModel, Field
 
 from pluto_duck_backend.app.core.config import get_settings
 from pluto_duck_backend.app.services.chat import get_chat_repository
+from pluto_duck_backend.app.services.llm import invalidate_llm_settings
 
 logger = logging.getLogger(__name__)
 
@@ -113,6 +114,7 @@ def update_settings(request: UpdateSettingsRequest) -> UpdateSettingsResponse:
 
     if payload:
         repo.update_settings(payload)
+        invalidate_llm_settings()
     
     return UpdateSettingsResponse(
         success=True,
@@ -135,7 +137,22 @@ def reset_database() -> ResetDatabaseResponse:
         
         # Close any existing connections by clearing the repository cache
         from pluto_duck_backend.app.services.chat.repository import get_chat_repository
+        from pluto_duck_backend.app.services.boards import reset_boards_repository
+        from pluto_duck_backend.app.services.duckdb_utils import close_warehouse_pools
+        from pluto_duck_backend.app.services.execution import reset_query_history_schema
+        from pluto_duck_backend.app.services.projects import get_project_repository
+        from pluto_duck_backend.app.services.source import (
+            get_source_service,
+            reset_source_metadata,
+        )
         get_chat_repository.cache_clear()
+        get_project_repository.cache_clear()
+        get_source_service.cache_clear()
+        reset_boards_repository()
+        close_warehouse_pools()
+        invalidate_llm_settings()
+        reset_query_history_schema()
+        reset_source_metadata()
         
         # Delete the DuckDB file if it exists
         if duckdb_path.exists():
@@ -39,9 +39,12 @@ def create_app() -> FastAPI:
     _configure_logging(settings)
     
     # Initialize database tables during startup to avoid race conditions
+    from pluto_duck_backend.app.services.boards import get_boards_repository
     from pluto_duck_backend.app.services.chat.repository import get_chat_repository
     try:
         _ = get_chat_repository()
+        # Open the boards connection now so the first request doesn't pay for it
+        _ = get_boards_repository()
         logging.info("Database tables initialized successfully")
     except Exception as e:
         logging.error(f"Failed to initialize database tables: {e}")
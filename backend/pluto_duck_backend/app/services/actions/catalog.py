@@ -86,7 +86,7 @@ def _persist_catalog(catalog: ActionCatalog) -> None:
     if not warehouse_path.exists():
         return
     try:
-        with connect_warehouse(warehouse_path) as con:
+        with connect_warehouse(warehouse_path, write=True) as con:
             con.execute(
             """
             CREATE TABLE IF NOT EXISTS action_catalog (
@@ -17,11 +17,13 @@ import uuid
 from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
+from functools import cached_property
 from pathlib import Path
 from typing import Any, Dict, List, Literal, Optional
 
 import chardet
 import duckdb
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -383,6 +385,11 @@ class FileDiagnosis:
     # LLM analysis result
     llm_analysis: Optional[LLMAnalysisResult] = None
 
+    @cached_property
+    def file_name(self) -> str:
+        """Base name of file_path, computed on first use."""
+        return os.path.basename(self.file_path)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
         return {
@@ -500,7 +507,7 @@ class FileDiagnosisService:
 
     def _ensure_metadata_tables(self) -> None:
         """Ensure metadata tables exist for caching diagnosis results."""
-        with self._get_connection() as conn:
+        with self._get_connection(write=True) as conn:
             conn.execute(f"CREATE SCHEMA IF NOT EXISTS {self.METADATA_SCHEMA}")
             conn.execute(f"""
                 CREATE TABLE IF NOT EXISTS {self.METADATA_SCHEMA}.{self.METADATA_TABLE} (
@@ -529,9 +536,9 @@ class FileDiagnosisService:
                 pass
 
     @contextmanager
-    def _get_connection(self):
-        """Get a DuckDB connection (serialized for stability)."""
-        with connect_warehouse(self.warehouse_path) as conn:
+    def _get_connection(self, write: bool = False):
+        """Get a pooled DuckDB connection; ``write`` serializes it with other writers."""
+        with connect_warehouse(self.warehouse_path, write=write) as conn:
             yield conn
 
     def _detect_encoding(self, file_path: str, sample_size: int = 10000) -> EncodingInfo:
@@ -1619,7 +1626,7 @@ class FileDiagnosisService:
         type_suggestions_json = json.dumps([ts.to_dict() for ts in diagnosis.type_suggestions])
         llm_analysis_json = json.dumps(diagnosis.llm_analysis.to_dict()) if diagnosis.llm_analysis else None
 
-        with self._get_connection() as conn:
+        with self._get_connection(write=True) as conn:
             # Delete existing diagnosis for this file path
             conn.execute(f"""
                 DELETE FROM {self.METADATA_SCHEMA}.{self.METADATA_TABLE}
@@ -1670,10 +1677,10 @@ class FileDiagnosisService:
                 return None
 
             # Deserialize JSON fields
-            schema_data = json.loads(result[2]) if result[2] else []
-            missing_values = json.loads(result[3]) if result[3] else {}
-            type_suggestions_data = json.loads(result[4]) if result[4] else []
-            llm_analysis_data = json.loads(result[8]) if result[8] else None
+            schema_data = orjson.loads(result[2]) if result[2] else []
+            missing_values = orjson.loads(result[3]) if result[3] else {}
+            type_suggestions_data = orjson.loads(result[4]) if result[4] else []
+            llm_analysis_data = orjson.loads(result[8]) if result[8] else None
 
             # Reconstruct schema
             schema = [
@@ -1742,7 +1749,7 @@ class FileDiagnosisService:
         Returns:
             True if deleted, False if not found
         """
-        with self._get_connection() as conn:
+        with self._get_connection(write=True) as conn:
             result = conn.execute(f"""
                 DELETE FROM {self.METADATA_SCHEMA}.{self.METADATA_TABLE}
                 WHERE file_path = ? AND project_id = ?
@@ -169,14 +169,14 @@ class FileAssetService:
         self._ensure_metadata_tables()
 
     @contextmanager
-    def _get_connection(self):
-        """Get a DuckDB connection (serialized for stability)."""
-        with connect_warehouse(self.warehouse_path) as conn:
+    def _get_connection(self, write: bool = False):
+        """Get a pooled DuckDB connection; ``write`` serializes it with other writers."""
+        with connect_warehouse(self.warehouse_path, write=write) as conn:
             yield conn
 
     def _ensure_metadata_tables(self) -> None:
         """Ensure metadata tables exist."""
-        with self._get_connection() as conn:
+        with self._get_connection(write=True) as conn:
             conn.execute(f"CREATE SCHEMA IF NOT EXISTS {self.METADATA_SCHEMA}")
             conn.execute(f"""
                 CREATE TABLE IF NOT EXISTS {self.METADATA_SCHEMA}.{self.METADATA_TABLE} (
@@ -263,7 +263,7 @@ class FileAssetService:
         else:
             raise AssetValidationError(f"Unsupported file type: {file_type}")
 
-        with self._get_connection() as conn:
+        with self._get_connection(write=True) as conn:
             try:
                 if mode == "replace":
                     # Replace mode: drop and recreate
@@ -499,7 +499,7 @@ class FileAssetService:
         Returns:
             True if deleted, False if not found
         """
-        with self._get_connection() as conn:
+        with self._get_connection(write=True) as conn:
             # Get table name first
             result = conn.execute(f"""
                 SELECT table_name FROM {self.METADATA_SCHEMA}.{self.METADATA_TABLE}
@@ -9,15 +9,18 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-import os
 from dataclasses import dataclass
 from datetime import UTC, datetime
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import orjson
 
 from pluto_duck_backend.app.services.llm import (
     BatchAnalysisSchema,
     FileAnalysisSchema,
     LLMService,
+    TokenUsage,
 )
 
 from .file_diagnosis_service import (
@@ -33,6 +36,16 @@ logger = logging.getLogger(__name__)
 # Batch size for LLM calls - can be adjusted for token efficiency
 LLM_BATCH_SIZE = 5
 
+# Estimated prompt tokens per batch; wide files are batched with fewer neighbours
+MAX_BATCH_TOKENS = 12000
+
+# Per-file caps on what goes into the prompt (prompt tokens drive latency and cost)
+MAX_SAMPLE_ROWS = 5
+MAX_COLUMN_STATISTICS = 20
+
+# Batches in flight at once, so large inputs don't run into provider rate limits
+LLM_MAX_CONCURRENCY = 8
+
 
 @dataclass
 class MergeContext:
@@ -62,6 +75,52 @@ class BatchLLMAnalysisResult:
     merged_result: Optional[MergedAnalysisResult] = None
 
 
+def _format_file(diag: FileDiagnosis) -> Dict[str, Any]:
+    """Build the LLM input entry for one file."""
+    return {
+        "file_path": diag.file_path,
+        "file_name": diag.file_name,
+        "schema": [
+            {"name": col.name, "type": col.type}
+            for col in diag.schema
+        ],
+        "row_count": diag.row_count,
+        "sample_rows": diag.sample_rows[:MAX_SAMPLE_ROWS],
+        "column_statistics": [
+            {
+                "column_name": cs.column_name,
+                "semantic_type": cs.semantic_type,
+                "null_percentage": cs.null_percentage,
+            }
+            for cs in diag.column_statistics[:MAX_COLUMN_STATISTICS]
+        ],
+    }
+
+
+def _format_diagnoses_payload(
+    diagnoses: List[FileDiagnosis],
+    merge_context: Optional[MergeContext] = None,
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """Build the structure that format_diagnoses_for_llm serializes."""
+    formatted = [_format_file(diag) for diag in diagnoses]
+
+    # When merge_context is provided, wrap in object with merge context
+    if merge_context is not None:
+        return {
+            "files": formatted,
+            "merge_context": {
+                "schemas_identical": merge_context.schemas_identical,
+                "total_files": merge_context.total_files,
+                "total_rows": merge_context.total_rows,
+                "duplicate_rows": merge_context.duplicate_rows,
+                "estimated_rows_after_dedup": merge_context.estimated_rows_after_dedup,
+                "skipped": merge_context.skipped,
+            },
+        }
+
+    return formatted
+
+
 def format_diagnoses_for_llm(
     diagnoses: List[FileDiagnosis],
     merge_context: Optional[MergeContext] = None,
@@ -77,44 +136,23 @@ def format_diagnoses_for_llm(
         When merge_context is provided, returns a JSON object with 'files' and 'merge_context' keys.
         Otherwise, returns a JSON array of file information.
     """
-    formatted = []
-    for diag in diagnoses:
-        file_info = {
-            "file_path": diag.file_path,
-            "file_name": os.path.basename(diag.file_path),
-            "schema": [
-                {"name": col.name, "type": col.type}
-                for col in diag.schema
-            ],
-            "row_count": diag.row_count,
-            "sample_rows": diag.sample_rows[:5],  # Limit to 5 rows
-            "column_statistics": [
-                {
-                    "column_name": cs.column_name,
-                    "semantic_type": cs.semantic_type,
-                    "null_percentage": cs.null_percentage,
-                }
-                for cs in diag.column_statistics
-            ],
-        }
-        formatted.append(file_info)
+    if merge_context is None:
+        return _join_files_json([_dumps_compact(_format_file(diag)) for diag in diagnoses])
+    return _dumps_compact(_format_diagnoses_payload(diagnoses, merge_context))
+
+
+def _dumps_compact(value: Any) -> str:
+    """Serialize LLM input as compact JSON (indentation only costs prompt tokens)."""
+    try:
+        return orjson.dumps(value, default=str).decode()
+    except orjson.JSONEncodeError:
+        # e.g. HUGEINT sample values beyond orjson's 64-bit integer range
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
 
-    # When merge_context is provided, wrap in object with merge context
-    if merge_context is not None:
-        result = {
-            "files": formatted,
-            "merge_context": {
-                "schemas_identical": merge_context.schemas_identical,
-                "total_files": merge_context.total_files,
-                "total_rows": merge_context.total_rows,
-                "duplicate_rows": merge_context.duplicate_rows,
-                "estimated_rows_after_dedup": merge_context.estimated_rows_after_dedup,
-                "skipped": merge_context.skipped,
-            },
-        }
-        return json.dumps(result, ensure_ascii=False, indent=2)
 
-    return json.dumps(formatted, ensure_ascii=False, indent=2)
+def _join_files_json(files_json: List[str]) -> str:
+    """Combine serialized file entries into the JSON array sent to the LLM."""
+    return "[" + ",".join(files_json) + "]"
 
 
 def _schema_to_result(
@@ -151,10 +189,63 @@ def _schema_to_result(
     )
 
 
+def _unique_by_path(diagnoses: List[FileDiagnosis]) -> List[FileDiagnosis]:
+    """Drop repeated file paths, keeping the first diagnosis seen for each."""
+    unique: Dict[str, FileDiagnosis] = {}
+    for diag in diagnoses:
+        unique.setdefault(diag.file_path, diag)
+    return list(unique.values())
+
+
+def _batch_formatted(
+    diagnoses: List[FileDiagnosis],
+) -> List[Tuple[List[FileDiagnosis], str]]:
+    """Split diagnoses, in order, into batches paired with their LLM input JSON.
+
+    A batch holds at most LLM_BATCH_SIZE files and closes early once the next
+    file would push its estimated tokens (about 4 characters per token) past
+    MAX_BATCH_TOKENS. A file that is over the budget on its own is sent alone.
+    Each file is serialized once, for both the estimate and the prompt.
+    """
+    batches: List[Tuple[List[FileDiagnosis], str]] = []
+    batch: List[FileDiagnosis] = []
+    batch_json: List[str] = []
+    batch_tokens = 0
+    for diagnosis in diagnoses:
+        file_json = _dumps_compact(_format_file(diagnosis))
+        tokens = len(file_json) // 4
+        if batch and (
+            len(batch) >= LLM_BATCH_SIZE or batch_tokens + tokens > MAX_BATCH_TOKENS
+        ):
+            batches.append((batch, _join_files_json(batch_json)))
+            batch = []
+            batch_json = []
+            batch_tokens = 0
+        batch.append(diagnosis)
+        batch_json.append(file_json)
+        batch_tokens += tokens
+    if batch:
+        batches.append((batch, _join_files_json(batch_json)))
+    return batches
+
+
+@lru_cache(maxsize=1)
+def _prompt_parts() -> Tuple[str, str]:
+    """Split the analysis prompt template around its payload, reading it once.
+
+    The instructions before ``{input_json}`` are byte-for-byte identical in
+    every request, so providers with prefix caching (OpenAI does this
+    automatically) can reuse them across batches and uploads.
+    """
+    prefix, _, suffix = load_dataset_analysis_prompt().partition("{input_json}")
+    return prefix, suffix
+
+
 async def analyze_batch_with_llm(
     diagnoses: List[FileDiagnosis],
     llm_service: LLMService,
     merge_context: Optional[MergeContext] = None,
+    usage: Optional[TokenUsage] = None,
 ) -> BatchLLMAnalysisResult:
     """Analyze a batch of file diagnoses using LLM with structured output.
 
@@ -162,6 +253,7 @@ async def analyze_batch_with_llm(
         diagnoses: List of FileDiagnosis objects to analyze
         llm_service: LLMService instance
         merge_context: Optional context for merging files with identical schemas
+        usage: Optional counter credited with the tokens this call uses
 
     Returns:
         BatchLLMAnalysisResult containing per-file results and optional merged analysis
@@ -169,20 +261,36 @@ async def analyze_batch_with_llm(
     if not diagnoses:
         return BatchLLMAnalysisResult(file_results={})
 
+    # Results are keyed by file_path, so a repeated file only costs tokens
+    diagnoses = _unique_by_path(diagnoses)
+
     # Format diagnoses for LLM (with or without merge_context)
     input_json = format_diagnoses_for_llm(diagnoses, merge_context)
 
-    # Load and format prompt
-    prompt_template = load_dataset_analysis_prompt()
-    prompt = prompt_template.replace("{input_json}", input_json)
+    return await _analyze_formatted_batch(
+        diagnoses, input_json, llm_service, merge_context is not None, usage
+    )
+
+
+async def _analyze_formatted_batch(
+    diagnoses: List[FileDiagnosis],
+    input_json: str,
+    llm_service: LLMService,
+    has_merge_context: bool,
+    usage: Optional[TokenUsage],
+) -> BatchLLMAnalysisResult:
+    """Run one LLM call on a batch whose input JSON is already built."""
+    prefix, suffix = _prompt_parts()
+    prompt = prefix + input_json + suffix
 
     # Call LLM with structured output
     try:
-        logger.info(f"[LLM] Calling LLM for {len(diagnoses)} files (merge_context={merge_context is not None})...")
+        logger.info(f"[LLM] Calling LLM for {len(diagnoses)} files (merge_context={has_merge_context})...")
 
         batch_result = await llm_service.complete_structured(
             prompt=prompt,
             response_schema=BatchAnalysisSchema,
+            usage=usage,
         )
 
         logger.info(f"[LLM] Got structured response with {len(batch_result.files)} files")
@@ -228,11 +336,13 @@ async def analyze_datasets_with_llm(
     diagnoses: List[FileDiagnosis],
     llm_service: LLMService | None = None,
     merge_context: Optional[MergeContext] = None,
+    budget_tokens: Optional[int] = None,
 ) -> BatchLLMAnalysisResult:
     """Analyze multiple file diagnoses using LLM with batching.
 
     Splits diagnoses into batches of LLM_BATCH_SIZE and processes
-    them in parallel using asyncio.gather().
+    them in parallel (at most LLM_MAX_CONCURRENCY at a time), collecting
+    results as each batch completes.
 
     When merge_context is provided, all files are analyzed in a single batch
     to allow the LLM to generate a unified merged analysis.
@@ -241,6 +351,8 @@ async def analyze_datasets_with_llm(
         diagnoses: List of FileDiagnosis objects to analyze
         llm_service: Optional LLMService instance. If None, creates a new one.
         merge_context: Optional context for merging files with identical schemas
+        budget_tokens: Optional ceiling on tokens spent by this call. Once the
+            completed batches exceed it, the remaining batches are cancelled.
 
     Returns:
         BatchLLMAnalysisResult containing per-file results and optional merged analysis
@@ -248,6 +360,8 @@ async def analyze_datasets_with_llm(
     if not diagnoses:
         return BatchLLMAnalysisResult(file_results={})
 
+    diagnoses = _unique_by_path(diagnoses)
+
     # Get LLM service if not provided
     if llm_service is None:
         llm_service = LLMService()
@@ -265,30 +379,52 @@ async def analyze_datasets_with_llm(
         return await analyze_batch_with_llm(diagnoses, llm_service, merge_context)
 
     # Otherwise, split into batches for parallel processing
-    batches: List[List[FileDiagnosis]] = []
-    for i in range(0, len(diagnoses), LLM_BATCH_SIZE):
-        batches.append(diagnoses[i : i + LLM_BATCH_SIZE])
+    batches = _batch_formatted(diagnoses)
 
     logger.info(
         f"Analyzing {len(diagnoses)} files in {len(batches)} batches "
-        f"(batch size: {LLM_BATCH_SIZE})"
+        f"(batch size: {LLM_BATCH_SIZE}, token budget: {MAX_BATCH_TOKENS})"
     )
 
-    # Process batches in parallel
+    # Counted per call rather than from the service total, which other
+    # analyses sharing the service also add to
+    usage = TokenUsage()
+
+    semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+    async def analyze_bounded(
+        batch: List[FileDiagnosis], input_json: str
+    ) -> BatchLLMAnalysisResult:
+        async with semaphore:
+            return await _analyze_formatted_batch(batch, input_json, llm_service, False, usage)
+
+    # Process batches in parallel, merging results as each batch finishes
     tasks = [
-        analyze_batch_with_llm(batch, llm_service)
-        for batch in batches
+        asyncio.ensure_future(analyze_bounded(batch, input_json))
+        for batch, input_json in batches
     ]
-    batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-    # Merge results
     all_file_results: Dict[str, LLMAnalysisResult] = {}
-    for result in batch_results:
-        if isinstance(result, Exception):
-            logger.error(f"Batch analysis failed: {result}")
-            continue
-        if isinstance(result, BatchLLMAnalysisResult):
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            try:
+                result = await next_result
+            except Exception as e:
+                logger.error(f"Batch analysis failed: {e}")
+                continue
             all_file_results.update(result.file_results)
 
+            if budget_tokens is not None:
+                used_tokens = usage.total_tokens
+                if used_tokens > budget_tokens:
+                    logger.warning(
+                        f"LLM token budget exceeded ({used_tokens} > {budget_tokens}), "
+                        "cancelling remaining batches"
+                    )
+                    break
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
     logger.info(f"LLM analysis completed: {len(all_file_results)}/{len(diagnoses)} files analyzed")
     return BatchLLMAnalysisResult(file_results=all_file_results)
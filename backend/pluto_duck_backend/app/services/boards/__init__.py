@@ -6,7 +6,9 @@ from .repository import (
     BoardQuery,
     BoardAsset,
     BoardsRepository,
+    clear_boards_caches,
     get_boards_repository,
+    reset_boards_repository,
 )
 from .service import BoardsService, get_boards_service
 
@@ -17,7 +19,9 @@ __all__ = [
     "BoardAsset",
     "BoardsRepository",
     "BoardsService",
+    "clear_boards_caches",
     "get_boards_repository",
     "get_boards_service",
+    "reset_boards_repository",
 ]
 
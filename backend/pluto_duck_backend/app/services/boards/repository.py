@@ -2,15 +2,171 @@
 
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+import duckdb
+import orjson
 
 from pluto_duck_backend.app.core.config import get_settings
-from pluto_duck_backend.app.services.duckdb_utils import connect_warehouse
+
+# Raw list_items rows, dropped by item writes and project deletion (the TTL
+# bounds staleness from writers outside this process)
+ITEMS_CACHE_SIZE = 256
+ITEMS_CACHE_TTL_SECONDS = 60.0
+
+# Decoded query result snapshots served by get_cached_snapshot
+SNAPSHOT_CACHE_SIZE = 1024
+SNAPSHOT_CACHE_TTL_SECONDS = 60.0
+
+# Hot statements parsed once per repository (see BoardsRepository._prepare)
+GET_BOARD_SQL = """
+    SELECT id::VARCHAR, project_id::VARCHAR, name, description, position,
+           created_at, updated_at, settings
+    FROM boards
+    WHERE id = ?
+    """
+
+GET_ITEM_SQL = """
+    SELECT id::VARCHAR, board_id::VARCHAR, item_type, title,
+           position_x, position_y, width, height,
+           payload, render_config, created_at, updated_at
+    FROM board_items
+    WHERE id = ?
+    """
+
+LIST_ITEMS_SQL = """
+    SELECT id, board_id, item_type, title, position_x, position_y, width, height,
+           payload, render_config, created_at, updated_at
+    FROM board_items
+    WHERE board_id = ?
+    ORDER BY position_y ASC, position_x ASC
+    """
+
+UPDATE_ITEM_POSITION_SQL = """
+    UPDATE board_items
+    SET position_x = ?, position_y = ?, width = ?, height = ?,
+        updated_at = CURRENT_TIMESTAMP AT TIME ZONE 'UTC'
+    WHERE id = ?
+    RETURNING board_id::VARCHAR
+    """
+
+GET_QUERY_SQL = """
+    SELECT id::VARCHAR, board_item_id::VARCHAR, query_text, data_source_tables,
+           refresh_mode, refresh_interval_seconds, last_executed_at, last_result_snapshot,
+           last_result_rows, execution_status, error_message, created_at, updated_at
+    FROM board_queries
+    WHERE id = ?
+    """
+
+GET_QUERY_BY_ITEM_SQL = """
+    SELECT id::VARCHAR, board_item_id::VARCHAR, query_text, data_source_tables,
+           refresh_mode, refresh_interval_seconds, last_executed_at, last_result_snapshot,
+           last_result_rows, execution_status, error_message, created_at, updated_at
+    FROM board_queries
+    WHERE board_item_id = ?
+    """
+
+UPDATE_QUERY_RESULT_SQL = """
+    UPDATE board_queries
+    SET last_executed_at = CURRENT_TIMESTAMP AT TIME ZONE 'UTC',
+        last_result_snapshot = ?,
+        last_result_rows = ?,
+        execution_status = ?,
+        error_message = ?,
+        updated_at = CURRENT_TIMESTAMP AT TIME ZONE 'UTC'
+    WHERE id = ?
+    """
+
+GET_QUERY_OWNER_SQL = """
+    SELECT q.id::VARCHAR, q.board_item_id::VARCHAR, q.query_text, q.data_source_tables,
+           q.refresh_mode, q.refresh_interval_seconds, q.last_executed_at,
+           q.last_result_snapshot, q.last_result_rows, q.execution_status, q.error_message,
+           q.created_at, q.updated_at, i.board_id::VARCHAR, b.project_id::VARCHAR
+    FROM board_queries q
+    LEFT JOIN board_items i ON i.id = q.board_item_id
+    LEFT JOIN boards b ON b.id = i.board_id
+    WHERE q.id = ?
+    """
+
+GET_ITEM_OWNER_SQL = """
+    SELECT i.board_id::VARCHAR, b.project_id::VARCHAR
+    FROM board_items i
+    LEFT JOIN boards b ON b.id = i.board_id
+    WHERE i.id = ?
+    """
+
+GET_ASSET_SQL = """
+    SELECT id::VARCHAR, board_item_id::VARCHAR, asset_type, file_name, file_path,
+           file_size, mime_type, thumbnail_path, created_at
+    FROM board_item_assets
+    WHERE id = ?
+    """
+
+HOT_STATEMENTS = (
+    GET_BOARD_SQL,
+    GET_ITEM_SQL,
+    LIST_ITEMS_SQL,
+    UPDATE_ITEM_POSITION_SQL,
+    GET_QUERY_SQL,
+    GET_QUERY_BY_ITEM_SQL,
+    UPDATE_QUERY_RESULT_SQL,
+    GET_QUERY_OWNER_SQL,
+    GET_ITEM_OWNER_SQL,
+    GET_ASSET_SQL,
+)
+
+
+def _uuid7() -> UUID:
+    """Generate a time-ordered UUIDv7 (RFC 9562).
+
+    48-bit millisecond timestamp, then version/variant bits and 74 random
+    bits, so IDs created later sort after earlier ones.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76
+    value |= ((rand >> 62) & 0xFFF) << 64
+    value |= 0b10 << 62
+    value |= rand & ((1 << 62) - 1)
+    return UUID(int=value)
+
+
+@lru_cache(maxsize=None)
+def _update_sql(table: str, columns: Tuple[str, ...]) -> str:
+    """Build the UPDATE statement for one combination of changed columns."""
+    assignments = "".join(f"{column} = ?, " for column in columns)
+    return (
+        f"UPDATE {table} SET {assignments}"
+        "updated_at = CURRENT_TIMESTAMP AT TIME ZONE 'UTC' WHERE id = ?"
+    )
+
+
+def _dumps_json(value: Any) -> str:
+    """Serialize a value to a JSON string for a DuckDB JSON column."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _loads_json_column(values: List[Optional[str]], empty: str) -> List[Any]:
+    """Decode a column of JSON strings with a single parser call.
+
+    Splicing the stored documents into one JSON array avoids per-row
+    parser setup; ``empty`` is the JSON literal used for missing values.
+    """
+    if not values:
+        return []
+    return orjson.loads("[" + ",".join(value or empty for value in values) + "]")
 
 
 @dataclass
@@ -56,13 +212,20 @@ class BoardQuery:
     refresh_mode: str
     refresh_interval_seconds: Optional[int]
     last_executed_at: Optional[datetime]
-    last_result_snapshot: Optional[Dict[str, Any]]
+    last_result_snapshot_json: Optional[str] = field(repr=False)
     last_result_rows: Optional[int]
     execution_status: str
     error_message: Optional[str]
     created_at: datetime
     updated_at: datetime
 
+    @cached_property
+    def last_result_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Cached result snapshot, decoded on first access."""
+        if not self.last_result_snapshot_json:
+            return None
+        return orjson.loads(self.last_result_snapshot_json)
+
 
 @dataclass
 class BoardAsset:
@@ -84,21 +247,156 @@ class BoardsRepository:
 
     def __init__(self, warehouse_path: Path) -> None:
         self.warehouse_path = warehouse_path
+        self.warehouse_path.parent.mkdir(parents=True, exist_ok=True)
+        # One long-lived connection; each operation works on its own cursor.
+        self._con = duckdb.connect(str(warehouse_path))
+        self._write_lock = threading.Lock()
+        self._statements: Dict[str, duckdb.Statement] = {}
+        # board_id -> (expiry, undecoded columns); item writes drop their board's
+        # entry and bump the generation so a read racing a write isn't stored
+        self._items_cache: OrderedDict[str, Tuple[float, Dict[str, List[Any]]]] = (
+            OrderedDict()
+        )
+        self._items_cache_generation = 0
+        self._items_cache_lock = threading.Lock()
+        # query_id -> (expiry, snapshot); every snapshot write goes through this repository
+        self._snapshot_cache: OrderedDict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
+        self._snapshot_cache_lock = threading.Lock()
+        for sql in HOT_STATEMENTS:
+            self._prepare(sql)
+        _live_repositories.add(self)
+
+    def close(self) -> None:
+        """Close the persistent warehouse connection."""
+        self._con.close()
+
+    @contextmanager
+    def _cursor(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Provide a cursor on the persistent connection."""
+        cursor = self._con.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+
+    def _prepare(self, sql: str) -> duckdb.Statement:
+        """Parse a statement once and reuse it on later calls."""
+        statement = self._statements.get(sql)
+        if statement is None:
+            statement = self._con.extract_statements(sql)[0]
+            self._statements[sql] = statement
+        return statement
+
+    @contextmanager
+    def _write_cursor(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Serialize writes within the process and provide a cursor."""
+        with self._write_lock:
+            with self._cursor() as con:
+                yield con
+
+    @contextmanager
+    def _write_transaction(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Provide a write cursor whose statements commit atomically."""
+        with self._write_cursor() as con:
+            con.execute("BEGIN TRANSACTION")
+            try:
+                yield con
+            except Exception:
+                con.execute("ROLLBACK")
+                raise
+            con.execute("COMMIT")
+
+    def _get_cached_items(self, board_id: str) -> Tuple[Optional[Dict[str, List[Any]]], int]:
+        """Return a board's cached item columns (or None) and the cache generation."""
+        with self._items_cache_lock:
+            generation = self._items_cache_generation
+            entry = self._items_cache.get(board_id)
+            if entry is None:
+                return None, generation
+            expires_at, columns = entry
+            if expires_at < time.monotonic():
+                del self._items_cache[board_id]
+                return None, generation
+            self._items_cache.move_to_end(board_id)
+            return columns, generation
+
+    def _store_cached_items(
+        self, board_id: str, generation: int, columns: Dict[str, List[Any]]
+    ) -> None:
+        """Cache a board's item columns, evicting the least recently used.
+
+        Skipped if an item write happened since ``generation`` was read, as the
+        items may predate it.
+        """
+        with self._items_cache_lock:
+            if generation != self._items_cache_generation:
+                return
+            self._items_cache[board_id] = (time.monotonic() + ITEMS_CACHE_TTL_SECONDS, columns)
+            self._items_cache.move_to_end(board_id)
+            while len(self._items_cache) > ITEMS_CACHE_SIZE:
+                self._items_cache.popitem(last=False)
+
+    def _forget_items(self, board_id: Optional[str]) -> None:
+        """Drop a board's cached items after a write to them."""
+        with self._items_cache_lock:
+            self._items_cache_generation += 1
+            if board_id is not None:
+                self._items_cache.pop(board_id, None)
+
+    def clear_caches(self) -> None:
+        """Drop every cached item list and snapshot (e.g. after a project delete)."""
+        with self._items_cache_lock:
+            self._items_cache_generation += 1
+            self._items_cache.clear()
+        with self._snapshot_cache_lock:
+            self._snapshot_cache.clear()
+
+    def _store_cached_snapshot(self, query_id: str, snapshot: Optional[Dict[str, Any]]) -> None:
+        """Cache (or, for None, forget) a query's result snapshot."""
+        with self._snapshot_cache_lock:
+            if snapshot is None:
+                self._snapshot_cache.pop(query_id, None)
+                return
+            self._snapshot_cache[query_id] = (
+                time.monotonic() + SNAPSHOT_CACHE_TTL_SECONDS,
+                snapshot,
+            )
+            self._snapshot_cache.move_to_end(query_id)
+            while len(self._snapshot_cache) > SNAPSHOT_CACHE_SIZE:
+                self._snapshot_cache.popitem(last=False)
 
-    def _connect(self):
-        """Create database connection."""
-        return connect_warehouse(self.warehouse_path)
+    def _forget_snapshots(self, query_ids: List[Tuple[str]]) -> None:
+        """Drop cached snapshots for deleted queries (rows from DELETE ... RETURNING)."""
+        with self._snapshot_cache_lock:
+            for (query_id,) in query_ids:
+                self._snapshot_cache.pop(query_id, None)
 
     def _generate_uuid(self) -> str:
-        """Generate UUID string."""
-        from uuid import uuid4
-        return str(uuid4())
+        """Generate a time-ordered UUID string for a new row."""
+        return str(_uuid7())
 
     def _ensure_utc(self, value: datetime) -> datetime:
         """Ensure datetime has UTC timezone."""
-        if value.tzinfo is None:
-            return value.replace(tzinfo=UTC)
-        return value.astimezone(UTC)
+        # Naive values (the DuckDB TIMESTAMP case) take the cheap path
+        return value.replace(tzinfo=UTC) if value.tzinfo is None else value.astimezone(UTC)
+
+    def _row_to_query(self, row: Tuple[Any, ...]) -> BoardQuery:
+        """Build a BoardQuery from the leading board_queries columns of a row."""
+        return BoardQuery(
+            id=row[0],
+            board_item_id=row[1],
+            query_text=row[2],
+            data_source_tables=orjson.loads(row[3]) if row[3] else [],
+            refresh_mode=row[4],
+            refresh_interval_seconds=row[5],
+            last_executed_at=self._ensure_utc(row[6]) if row[6] else None,
+            last_result_snapshot_json=row[7],
+            last_result_rows=row[8],
+            execution_status=row[9],
+            error_message=row[10],
+            created_at=self._ensure_utc(row[11]),
+            updated_at=self._ensure_utc(row[12]),
+        )
 
     # ========== Board CRUD ==========
 
@@ -111,36 +409,31 @@ class BoardsRepository:
     ) -> str:
         """Create a new board."""
         board_id = self._generate_uuid()
-        now = datetime.now(UTC).isoformat()
-        settings_json = json.dumps(settings or {})
-
-        with self._connect() as con:
-            # Get max position for project
-            max_pos_row = con.execute(
-                "SELECT COALESCE(MAX(position), -1) FROM boards WHERE project_id = ?",
-                [project_id],
-            ).fetchone()
-            position = (max_pos_row[0] if max_pos_row else -1) + 1
+        settings_json = _dumps_json(settings or {})
 
+        with self._write_cursor() as con:
+            # Next position for the project is computed in the same statement
             con.execute(
                 """
                 INSERT INTO boards (id, project_id, name, description, position, created_at, updated_at, settings)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                SELECT
+                    ?, ?, ?, ?,
+                    COALESCE(MAX(position), -1) + 1,
+                    CURRENT_TIMESTAMP AT TIME ZONE 'UTC', CURRENT_TIMESTAMP AT TIME ZONE 'UTC',
+                    ?
+                FROM boards
+                WHERE project_id = ?
                 """,
-                [board_id, project_id, name, description, position, now, now, settings_json],
+                [board_id, project_id, name, description, settings_json, project_id],
             )
 
         return board_id
 
     def get_board(self, board_id: str) -> Optional[Board]:
         """Get board by ID."""
-        with self._connect() as con:
+        with self._cursor() as con:
             row = con.execute(
-                """
-                SELECT id, project_id, name, description, position, created_at, updated_at, settings
-                FROM boards
-                WHERE id = ?
-                """,
+                self._prepare(GET_BOARD_SQL),
                 [board_id],
             ).fetchone()
 
@@ -148,52 +441,83 @@ class BoardsRepository:
             return None
 
         return Board(
-            id=str(row[0]),
-            project_id=str(row[1]),
+            id=row[0],
+            project_id=row[1],
             name=row[2],
             description=row[3],
             position=row[4],
             created_at=self._ensure_utc(row[5]),
             updated_at=self._ensure_utc(row[6]),
-            settings=json.loads(row[7]) if row[7] else {},
+            settings=orjson.loads(row[7]) if row[7] else {},
         )
 
     def list_boards(self, project_id: str) -> List[Board]:
         """List all boards for a project, ordered by most recently updated first (based on items)."""
-        with self._connect() as con:
-            rows = con.execute(
+        with self._cursor() as con:
+            table = con.execute(
                 """
-                SELECT 
-                    b.id, 
-                    b.project_id, 
-                    b.name, 
-                    b.description, 
-                    b.position, 
-                    b.created_at, 
-                    b.updated_at, 
+                WITH last_item_update AS (
+                    SELECT board_id, MAX(updated_at) AS updated_at
+                    FROM board_items
+                    WHERE board_id IN (SELECT id FROM boards WHERE project_id = ?)
+                    GROUP BY board_id
+                )
+                SELECT
+                    b.id,
+                    b.project_id,
+                    b.name,
+                    b.description,
+                    b.position,
+                    b.created_at,
+                    b.updated_at,
                     b.settings,
-                    COALESCE(MAX(bi.updated_at), b.updated_at) as effective_updated_at
+                    COALESCE(liu.updated_at, b.updated_at) as effective_updated_at
                 FROM boards b
-                LEFT JOIN board_items bi ON b.id = bi.board_id
+                LEFT JOIN last_item_update liu ON liu.board_id = b.id
                 WHERE b.project_id = ?
-                GROUP BY b.id, b.project_id, b.name, b.description, b.position, b.created_at, b.updated_at, b.settings
                 ORDER BY effective_updated_at DESC
                 """,
-                [project_id],
-            ).fetchall()
+                [project_id, project_id],
+            ).fetch_arrow_table()
+
+        # Build boards column-by-column instead of unpacking row tuples
+        columns = table.to_pydict()
+        settings = [orjson.loads(value) if value else {} for value in columns["settings"]]
+        # TIMESTAMP columns arrive as naive UTC datetimes, so just tag them
+        created_at = [value.replace(tzinfo=UTC) for value in columns["created_at"]]
+        # Use effective_updated_at
+        updated_at = [value.replace(tzinfo=UTC) for value in columns["effective_updated_at"]]
 
         return [
             Board(
-                id=str(row[0]),
-                project_id=str(row[1]),
-                name=row[2],
-                description=row[3],
-                position=row[4],
-                created_at=self._ensure_utc(row[5]),
-                updated_at=self._ensure_utc(row[8]),  # Use effective_updated_at
-                settings=json.loads(row[7]) if row[7] else {},
+                id=board_id,
+                project_id=board_project_id,
+                name=name,
+                description=description,
+                position=position,
+                created_at=board_created_at,
+                updated_at=board_updated_at,
+                settings=board_settings,
+            )
+            for (
+                board_id,
+                board_project_id,
+                name,
+                description,
+                position,
+                board_created_at,
+                board_updated_at,
+                board_settings,
+            ) in zip(
+                columns["id"],
+                columns["project_id"],
+                columns["name"],
+                columns["description"],
+                columns["position"],
+                created_at,
+                updated_at,
+                settings,
             )
-            for row in rows
         ]
 
     def update_board(
@@ -204,28 +528,27 @@ class BoardsRepository:
         settings: Optional[Dict[str, Any]] = None,
     ) -> bool:
         """Update board fields."""
-        updates = []
-        params = []
+        columns: List[str] = []
+        params: List[Any] = []
 
         if name is not None:
-            updates.append("name = ?")
+            columns.append("name")
             params.append(name)
         if description is not None:
-            updates.append("description = ?")
+            columns.append("description")
             params.append(description)
         if settings is not None:
-            updates.append("settings = ?")
-            params.append(json.dumps(settings))
+            columns.append("settings")
+            params.append(_dumps_json(settings))
 
-        if not updates:
+        if not columns:
             return False
 
-        updates.append("updated_at = CURRENT_TIMESTAMP")
         params.append(board_id)
 
-        with self._connect() as con:
+        with self._write_cursor() as con:
             con.execute(
-                f"UPDATE boards SET {', '.join(updates)} WHERE id = ?",
+                self._prepare(_update_sql("boards", tuple(columns))),
                 params,
             )
 
@@ -233,44 +556,53 @@ class BoardsRepository:
 
     def delete_board(self, board_id: str) -> bool:
         """Delete a board and all its items (manual cascade since DuckDB doesn't support CASCADE)."""
-        with self._connect() as con:
-            exists = con.execute(
-                "SELECT 1 FROM boards WHERE id = ?",
+        with self._write_transaction() as con:
+            # Delete related data for all items of the board in one pass each
+            con.execute(
+                """
+                DELETE FROM board_item_assets
+                WHERE board_item_id IN (SELECT id FROM board_items WHERE board_id = ?)
+                """,
                 [board_id],
-            ).fetchone()
-
-            if not exists:
-                return False
-
-            # Get all items for this board
-            items = con.execute(
-                "SELECT id FROM board_items WHERE board_id = ?",
+            )
+            deleted_queries = con.execute(
+                """
+                DELETE FROM board_queries
+                WHERE board_item_id IN (SELECT id FROM board_items WHERE board_id = ?)
+                RETURNING id::VARCHAR
+                """,
                 [board_id],
             ).fetchall()
 
-            # Delete related data for each item
-            for (item_id,) in items:
-                # Delete assets
-                con.execute("DELETE FROM board_item_assets WHERE board_item_id = ?", [str(item_id)])
-                # Delete queries
-                con.execute("DELETE FROM board_queries WHERE board_item_id = ?", [str(item_id)])
-
             # Delete all items
             con.execute("DELETE FROM board_items WHERE board_id = ?", [board_id])
-            
-            # Finally delete the board
-            con.execute("DELETE FROM boards WHERE id = ?", [board_id])
 
-        return True
+            # Finally delete the board; the affected-row count tells whether it existed
+            deleted = con.execute("DELETE FROM boards WHERE id = ?", [board_id]).fetchone()
+
+        self._forget_items(board_id)
+        self._forget_snapshots(deleted_queries)
+        return bool(deleted and deleted[0])
 
     def reorder_boards(self, project_id: str, board_positions: List[Tuple[str, int]]) -> bool:
         """Reorder boards by updating positions."""
-        with self._connect() as con:
-            for board_id, position in board_positions:
-                con.execute(
-                    "UPDATE boards SET position = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ? AND project_id = ?",
-                    [position, board_id, project_id],
-                )
+        if not board_positions:
+            return True
+
+        values_sql = ", ".join("(?, ?)" for _ in board_positions)
+        params: List[Any] = [value for pair in board_positions for value in pair]
+        params.append(project_id)
+
+        with self._write_cursor() as con:
+            con.execute(
+                f"""
+                UPDATE boards
+                SET position = v.position, updated_at = CURRENT_TIMESTAMP AT TIME ZONE 'UTC'
+                FROM (VALUES {values_sql}) AS v(id, position)
+                WHERE boards.id = CAST(v.id AS UUID) AND boards.project_id = ?
+                """,
+                params,
+            )
 
         return True
 
@@ -290,18 +622,20 @@ class BoardsRepository:
     ) -> str:
         """Create a board item."""
         item_id = self._generate_uuid()
-        now = datetime.now(UTC).isoformat()
-        payload_json = json.dumps(payload)
-        render_config_json = json.dumps(render_config) if render_config else None
+        payload_json = _dumps_json(payload)
+        render_config_json = _dumps_json(render_config) if render_config else None
 
-        with self._connect() as con:
+        with self._write_cursor() as con:
             con.execute(
                 """
                 INSERT INTO board_items (
                     id, board_id, item_type, title, position_x, position_y, width, height,
                     payload, render_config, created_at, updated_at
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (
+                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                    CURRENT_TIMESTAMP AT TIME ZONE 'UTC', CURRENT_TIMESTAMP AT TIME ZONE 'UTC'
+                )
                 """,
                 [
                     item_id,
@@ -314,23 +648,66 @@ class BoardsRepository:
                     height,
                     payload_json,
                     render_config_json,
-                    now,
-                    now,
                 ],
             )
 
+        self._forget_items(board_id)
         return item_id
 
+    def bulk_create_items(self, board_id: str, items: List[Dict[str, Any]]) -> List[str]:
+        """Create several board items with a single multi-row INSERT.
+
+        Each entry accepts the same keys as `create_item` (`item_type` and
+        `payload` are required). Returns the new item IDs in input order.
+        """
+        if not items:
+            return []
+
+        item_ids = [self._generate_uuid() for _ in items]
+        params: List[Any] = []
+        for item_id, item in zip(item_ids, items):
+            render_config = item.get("render_config")
+            params.extend(
+                [
+                    item_id,
+                    board_id,
+                    item["item_type"],
+                    item.get("title"),
+                    item.get("position_x", 0),
+                    item.get("position_y", 0),
+                    item.get("width", 1),
+                    item.get("height", 1),
+                    _dumps_json(item["payload"]),
+                    _dumps_json(render_config) if render_config else None,
+                ]
+            )
+        # created_at/updated_at share the transaction's start time
+        row_sql = (
+            "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, "
+            "CURRENT_TIMESTAMP AT TIME ZONE 'UTC', CURRENT_TIMESTAMP AT TIME ZONE 'UTC')"
+        )
+        values_sql = ", ".join(row_sql for _ in items)
+
+        with self._write_cursor() as con:
+            con.execute(
+                f"""
+                INSERT INTO board_items (
+                    id, board_id, item_type, title, position_x, position_y, width, height,
+                    payload, render_config, created_at, updated_at
+                )
+                VALUES {values_sql}
+                """,
+                params,
+            )
+
+        self._forget_items(board_id)
+        return item_ids
+
     def get_item(self, item_id: str) -> Optional[BoardItem]:
         """Get board item by ID."""
-        with self._connect() as con:
+        with self._cursor() as con:
             row = con.execute(
-                """
-                SELECT id, board_id, item_type, title, position_x, position_y, width, height,
-                       payload, render_config, created_at, updated_at
-                FROM board_items
-                WHERE id = ?
-                """,
+                self._prepare(GET_ITEM_SQL),
                 [item_id],
             ).fetchone()
 
@@ -338,51 +715,104 @@ class BoardsRepository:
             return None
 
         return BoardItem(
-            id=str(row[0]),
-            board_id=str(row[1]),
+            id=row[0],
+            board_id=row[1],
             item_type=row[2],
             title=row[3],
             position_x=row[4],
             position_y=row[5],
             width=row[6],
             height=row[7],
-            payload=json.loads(row[8]) if row[8] else {},
-            render_config=json.loads(row[9]) if row[9] else None,
+            payload=orjson.loads(row[8]) if row[8] else {},
+            render_config=orjson.loads(row[9]) if row[9] else None,
             created_at=self._ensure_utc(row[10]),
             updated_at=self._ensure_utc(row[11]),
         )
 
-    def list_items(self, board_id: str) -> List[BoardItem]:
-        """List all items for a board."""
-        with self._connect() as con:
-            rows = con.execute(
-                """
-                SELECT id, board_id, item_type, title, position_x, position_y, width, height,
-                       payload, render_config, created_at, updated_at
-                FROM board_items
-                WHERE board_id = ?
-                ORDER BY position_y ASC, position_x ASC
-                """,
-                [board_id],
-            ).fetchall()
+    def get_item_owner(self, item_id: str) -> Optional[Tuple[str, Optional[str]]]:
+        """Get ``(board_id, project_id)`` for an item in one lookup.
 
-        return [
+        ``project_id`` is None when the item's board no longer exists.
+        """
+        with self._cursor() as con:
+            row = con.execute(
+                self._prepare(GET_ITEM_OWNER_SQL),
+                [item_id],
+            ).fetchone()
+
+        if not row:
+            return None
+
+        return row[0], row[1]
+
+    def list_items(self, board_id: str) -> List[BoardItem]:
+        """List all items for a board.
+
+        The fetched rows are cached per board until an item write touches the
+        board. JSON columns stay undecoded in the cache, so every call builds
+        fresh items that callers may modify.
+        """
+        columns, generation = self._get_cached_items(board_id)
+        if columns is None:
+            with self._cursor() as con:
+                table = con.execute(
+                    self._prepare(LIST_ITEMS_SQL),
+                    [board_id],
+                ).fetch_arrow_table()
+            columns = table.to_pydict()
+            # TIMESTAMP columns arrive as naive UTC datetimes, so just tag them
+            columns["created_at"] = [value.replace(tzinfo=UTC) for value in columns["created_at"]]
+            columns["updated_at"] = [value.replace(tzinfo=UTC) for value in columns["updated_at"]]
+            self._store_cached_items(board_id, generation, columns)
+
+        # Build items column-by-column instead of unpacking row tuples
+        payloads = _loads_json_column(columns["payload"], "{}")
+        render_configs = _loads_json_column(columns["render_config"], "null")
+
+        items = [
             BoardItem(
-                id=str(row[0]),
-                board_id=str(row[1]),
-                item_type=row[2],
-                title=row[3],
-                position_x=row[4],
-                position_y=row[5],
-                width=row[6],
-                height=row[7],
-                payload=json.loads(row[8]) if row[8] else {},
-                render_config=json.loads(row[9]) if row[9] else None,
-                created_at=self._ensure_utc(row[10]),
-                updated_at=self._ensure_utc(row[11]),
+                id=item_id,
+                board_id=item_board_id,
+                item_type=item_type,
+                title=title,
+                position_x=position_x,
+                position_y=position_y,
+                width=width,
+                height=height,
+                payload=payload,
+                render_config=render_config,
+                created_at=item_created_at,
+                updated_at=item_updated_at,
+            )
+            for (
+                item_id,
+                item_board_id,
+                item_type,
+                title,
+                position_x,
+                position_y,
+                width,
+                height,
+                payload,
+                render_config,
+                item_created_at,
+                item_updated_at,
+            ) in zip(
+                columns["id"],
+                columns["board_id"],
+                columns["item_type"],
+                columns["title"],
+                columns["position_x"],
+                columns["position_y"],
+                columns["width"],
+                columns["height"],
+                payloads,
+                render_configs,
+                columns["created_at"],
+                columns["updated_at"],
             )
-            for row in rows
         ]
+        return items
 
     def update_item(
         self,
@@ -392,54 +822,53 @@ class BoardsRepository:
         render_config: Optional[Dict[str, Any]] = None,
     ) -> bool:
         """Update item fields."""
-        updates = []
-        params = []
+        columns: List[str] = []
+        params: List[Any] = []
 
         if title is not None:
-            updates.append("title = ?")
+            columns.append("title")
             params.append(title)
         if payload is not None:
-            updates.append("payload = ?")
-            params.append(json.dumps(payload))
+            columns.append("payload")
+            params.append(_dumps_json(payload))
         if render_config is not None:
-            updates.append("render_config = ?")
-            params.append(json.dumps(render_config))
+            columns.append("render_config")
+            params.append(_dumps_json(render_config))
 
-        if not updates:
+        if not columns:
             return False
 
-        now = datetime.now(UTC).isoformat()
-        updates.append("updated_at = ?")
-        params.append(now)
         params.append(item_id)
 
-        with self._connect() as con:
-            con.execute(
-                f"UPDATE board_items SET {', '.join(updates)} WHERE id = ?",
+        with self._write_cursor() as con:
+            updated = con.execute(
+                self._prepare(
+                    _update_sql("board_items", tuple(columns)) + " RETURNING board_id::VARCHAR"
+                ),
                 params,
-            )
+            ).fetchone()
 
+        self._forget_items(updated[0] if updated else None)
         return True
 
     def delete_item(self, item_id: str) -> bool:
         """Delete a board item (manual cascade to queries/assets)."""
-        with self._connect() as con:
-            exists = con.execute(
-                "SELECT 1 FROM board_items WHERE id = ?",
-                [item_id],
-            ).fetchone()
-
-            if not exists:
-                return False
-
+        with self._write_transaction() as con:
             # Delete related data first
             con.execute("DELETE FROM board_item_assets WHERE board_item_id = ?", [item_id])
-            con.execute("DELETE FROM board_queries WHERE board_item_id = ?", [item_id])
-            
-            # Then delete the item
-            con.execute("DELETE FROM board_items WHERE id = ?", [item_id])
+            deleted_queries = con.execute(
+                "DELETE FROM board_queries WHERE board_item_id = ? RETURNING id::VARCHAR",
+                [item_id],
+            ).fetchall()
 
-        return True
+            # Then delete the item; a returned row means it existed
+            deleted = con.execute(
+                "DELETE FROM board_items WHERE id = ? RETURNING board_id::VARCHAR", [item_id]
+            ).fetchone()
+
+        self._forget_items(deleted[0] if deleted else None)
+        self._forget_snapshots(deleted_queries)
+        return deleted is not None
 
     def update_item_position(
         self,
@@ -450,18 +879,13 @@ class BoardsRepository:
         height: int,
     ) -> bool:
         """Update item position and size."""
-        now = datetime.now(UTC).isoformat()
-        
-        with self._connect() as con:
-            con.execute(
-                """
-                UPDATE board_items
-                SET position_x = ?, position_y = ?, width = ?, height = ?, updated_at = ?
-                WHERE id = ?
-                """,
-                [position_x, position_y, width, height, now, item_id],
-            )
+        with self._write_cursor() as con:
+            updated = con.execute(
+                self._prepare(UPDATE_ITEM_POSITION_SQL),
+                [position_x, position_y, width, height, item_id],
+            ).fetchone()
 
+        self._forget_items(updated[0] if updated else None)
         return True
 
     # ========== BoardQuery CRUD ==========
@@ -476,88 +900,69 @@ class BoardsRepository:
     ) -> str:
         """Create a query for a board item."""
         query_id = self._generate_uuid()
-        now = datetime.now(UTC).isoformat()
-        tables_json = json.dumps(data_source_tables or [])
+        tables_json = _dumps_json(data_source_tables or [])
 
-        with self._connect() as con:
+        with self._write_cursor() as con:
             con.execute(
                 """
                 INSERT INTO board_queries (
                     id, board_item_id, query_text, data_source_tables, refresh_mode,
                     refresh_interval_seconds, created_at, updated_at
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (
+                    ?, ?, ?, ?, ?, ?,
+                    CURRENT_TIMESTAMP AT TIME ZONE 'UTC', CURRENT_TIMESTAMP AT TIME ZONE 'UTC'
+                )
                 """,
-                [query_id, item_id, query_text, tables_json, refresh_mode, refresh_interval_seconds, now, now],
+                [query_id, item_id, query_text, tables_json, refresh_mode, refresh_interval_seconds],
             )
 
         return query_id
 
     def get_query(self, query_id: str) -> Optional[BoardQuery]:
         """Get query by ID."""
-        with self._connect() as con:
+        with self._cursor() as con:
             row = con.execute(
-                """
-                SELECT id, board_item_id, query_text, data_source_tables, refresh_mode,
-                       refresh_interval_seconds, last_executed_at, last_result_snapshot,
-                       last_result_rows, execution_status, error_message, created_at, updated_at
-                FROM board_queries
-                WHERE id = ?
-                """,
+                self._prepare(GET_QUERY_SQL),
                 [query_id],
             ).fetchone()
 
         if not row:
             return None
 
-        return BoardQuery(
-            id=row[0],
-            board_item_id=row[1],
-            query_text=row[2],
-            data_source_tables=json.loads(row[3]) if row[3] else [],
-            refresh_mode=row[4],
-            refresh_interval_seconds=row[5],
-            last_executed_at=self._ensure_utc(row[6]) if row[6] else None,
-            last_result_snapshot=json.loads(row[7]) if row[7] else None,
-            last_result_rows=row[8],
-            execution_status=row[9],
-            error_message=row[10],
-            created_at=self._ensure_utc(row[11]),
-            updated_at=self._ensure_utc(row[12]),
-        )
+        return self._row_to_query(row)
 
     def get_query_by_item(self, item_id: str) -> Optional[BoardQuery]:
         """Get query by board item ID."""
-        with self._connect() as con:
+        with self._cursor() as con:
             row = con.execute(
-                """
-                SELECT id, board_item_id, query_text, data_source_tables, refresh_mode,
-                       refresh_interval_seconds, last_executed_at, last_result_snapshot,
-                       last_result_rows, execution_status, error_message, created_at, updated_at
-                FROM board_queries
-                WHERE board_item_id = ?
-                """,
+                self._prepare(GET_QUERY_BY_ITEM_SQL),
                 [item_id],
             ).fetchone()
 
         if not row:
             return None
 
-        return BoardQuery(
-            id=str(row[0]),
-            board_item_id=str(row[1]),
-            query_text=row[2],
-            data_source_tables=json.loads(row[3]) if row[3] else [],
-            refresh_mode=row[4],
-            refresh_interval_seconds=row[5],
-            last_executed_at=self._ensure_utc(row[6]) if row[6] else None,
-            last_result_snapshot=json.loads(row[7]) if row[7] else None,
-            last_result_rows=row[8],
-            execution_status=row[9],
-            error_message=row[10],
-            created_at=self._ensure_utc(row[11]),
-            updated_at=self._ensure_utc(row[12]),
-        )
+        return self._row_to_query(row)
+
+    def get_query_with_owner(
+        self, query_id: str
+    ) -> Optional[Tuple[BoardQuery, Optional[str], Optional[str]]]:
+        """Get a query with its owning ``board_id`` and ``project_id`` in one lookup.
+
+        ``board_id`` is None when the query's item is missing and ``project_id``
+        is None when the item's board is missing.
+        """
+        with self._cursor() as con:
+            row = con.execute(
+                self._prepare(GET_QUERY_OWNER_SQL),
+                [query_id],
+            ).fetchone()
+
+        if not row:
+            return None
+
+        return self._row_to_query(row), row[13], row[14]
 
     def update_query(
         self,
@@ -567,28 +972,27 @@ class BoardsRepository:
         refresh_interval_seconds: Optional[int] = None,
     ) -> bool:
         """Update query fields."""
-        updates = []
-        params = []
+        columns: List[str] = []
+        params: List[Any] = []
 
         if query_text is not None:
-            updates.append("query_text = ?")
+            columns.append("query_text")
             params.append(query_text)
         if refresh_mode is not None:
-            updates.append("refresh_mode = ?")
+            columns.append("refresh_mode")
             params.append(refresh_mode)
         if refresh_interval_seconds is not None:
-            updates.append("refresh_interval_seconds = ?")
+            columns.append("refresh_interval_seconds")
             params.append(refresh_interval_seconds)
 
-        if not updates:
+        if not columns:
             return False
 
-        updates.append("updated_at = CURRENT_TIMESTAMP")
         params.append(query_id)
 
-        with self._connect() as con:
+        with self._write_cursor() as con:
             con.execute(
-                f"UPDATE board_queries SET {', '.join(updates)} WHERE id = ?",
+                self._prepare(_update_sql("board_queries", tuple(columns))),
                 params,
             )
 
@@ -603,26 +1007,40 @@ class BoardsRepository:
         error_message: Optional[str] = None,
     ) -> bool:
         """Update query execution result and status."""
-        now = datetime.now(UTC).isoformat()
-        result_json = json.dumps(result) if result else None
+        result_json = _dumps_json(result) if result else None
 
-        with self._connect() as con:
-            con.execute(
-                """
-                UPDATE board_queries
-                SET last_executed_at = ?,
-                    last_result_snapshot = ?,
-                    last_result_rows = ?,
-                    execution_status = ?,
-                    error_message = ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-                """,
-                [now, result_json, rows, status, error_message, query_id],
-            )
+        with self._write_cursor() as con:
+            updated = con.execute(
+                self._prepare(UPDATE_QUERY_RESULT_SQL),
+                [result_json, rows, status, error_message, query_id],
+            ).fetchone()
+
+        # The statement's own row count says whether the query exists
+        if not (updated and updated[0]):
+            return False
 
+        # Write through so the next cached-result read skips the database
+        self._store_cached_snapshot(query_id, result or None)
         return True
 
+    def get_cached_snapshot(self, query_id: str) -> Optional[Dict[str, Any]]:
+        """Get a query's last result snapshot, served from memory when fresh."""
+        with self._snapshot_cache_lock:
+            entry = self._snapshot_cache.get(query_id)
+            if entry is not None:
+                expires_at, snapshot = entry
+                if expires_at >= time.monotonic():
+                    self._snapshot_cache.move_to_end(query_id)
+                    return snapshot
+                del self._snapshot_cache[query_id]
+
+        query = self.get_query(query_id)
+        if not query or not query.last_result_snapshot:
+            return None
+
+        self._store_cached_snapshot(query_id, query.last_result_snapshot)
+        return query.last_result_snapshot
+
     # ========== BoardAsset CRUD ==========
 
     def create_asset(
@@ -637,32 +1055,25 @@ class BoardsRepository:
     ) -> str:
         """Create an asset record."""
         asset_id = self._generate_uuid()
-        now = datetime.now(UTC).isoformat()
-
-        with self._connect() as con:
+        with self._write_cursor() as con:
             con.execute(
                 """
                 INSERT INTO board_item_assets (
                     id, board_item_id, asset_type, file_name, file_path,
                     file_size, mime_type, thumbnail_path, created_at
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP AT TIME ZONE 'UTC')
                 """,
-                [asset_id, item_id, asset_type, file_name, file_path, file_size, mime_type, thumbnail_path, now],
+                [asset_id, item_id, asset_type, file_name, file_path, file_size, mime_type, thumbnail_path],
             )
 
         return asset_id
 
     def get_asset(self, asset_id: str) -> Optional[BoardAsset]:
         """Get asset by ID."""
-        with self._connect() as con:
+        with self._cursor() as con:
             row = con.execute(
-                """
-                SELECT id, board_item_id, asset_type, file_name, file_path,
-                       file_size, mime_type, thumbnail_path, created_at
-                FROM board_item_assets
-                WHERE id = ?
-                """,
+                self._prepare(GET_ASSET_SQL),
                 [asset_id],
             ).fetchone()
 
@@ -670,8 +1081,8 @@ class BoardsRepository:
             return None
 
         return BoardAsset(
-            id=str(row[0]),
-            board_item_id=str(row[1]),
+            id=row[0],
+            board_item_id=row[1],
             asset_type=row[2],
             file_name=row[3],
             file_path=row[4],
@@ -683,10 +1094,10 @@ class BoardsRepository:
 
     def list_assets(self, item_id: str) -> List[BoardAsset]:
         """List all assets for a board item."""
-        with self._connect() as con:
+        with self._cursor() as con:
             rows = con.execute(
                 """
-                SELECT id, board_item_id, asset_type, file_name, file_path,
+                SELECT id::VARCHAR, board_item_id::VARCHAR, asset_type, file_name, file_path,
                        file_size, mime_type, thumbnail_path, created_at
                 FROM board_item_assets
                 WHERE board_item_id = ?
@@ -697,8 +1108,8 @@ class BoardsRepository:
 
         return [
             BoardAsset(
-                id=str(row[0]),
-                board_item_id=str(row[1]),
+                id=row[0],
+                board_item_id=row[1],
                 asset_type=row[2],
                 file_name=row[3],
                 file_path=row[4],
@@ -712,23 +1123,51 @@ class BoardsRepository:
 
     def delete_asset(self, asset_id: str) -> bool:
         """Delete an asset record."""
-        with self._connect() as con:
-            exists = con.execute(
-                "SELECT 1 FROM board_item_assets WHERE id = ?",
+        with self._write_cursor() as con:
+            deleted = con.execute(
+                "DELETE FROM board_item_assets WHERE id = ?",
                 [asset_id],
             ).fetchone()
 
-            if not exists:
-                return False
+        return bool(deleted and deleted[0])
 
-            con.execute("DELETE FROM board_item_assets WHERE id = ?", [asset_id])
 
-        return True
+# Every open repository, so writes made elsewhere can drop their caches
+_live_repositories: weakref.WeakSet[BoardsRepository] = weakref.WeakSet()
+
+
+def clear_boards_caches(warehouse_path: Path) -> None:
+    """Drop the caches of every boards repository open on ``warehouse_path``.
+
+    For writes to board data that bypass the repository, such as the cascade
+    in ``ProjectRepository.delete_project``.
+    """
+    target = Path(warehouse_path).resolve()
+    for repo in list(_live_repositories):
+        if repo.warehouse_path.resolve() == target:
+            repo.clear_caches()
+
+
+_boards_repository: Optional[BoardsRepository] = None
+_boards_repository_lock = threading.Lock()
 
 
-@lru_cache(maxsize=1)
 def get_boards_repository() -> BoardsRepository:
     """Get boards repository singleton."""
-    settings = get_settings()
-    return BoardsRepository(settings.duckdb.path)
-
+    global _boards_repository
+    repo = _boards_repository
+    if repo is None:
+        with _boards_repository_lock:
+            if _boards_repository is None:
+                _boards_repository = BoardsRepository(get_settings().duckdb.path)
+            repo = _boards_repository
+    return repo
+
+
+def reset_boards_repository() -> None:
+    """Close the boards repository so the next access reopens the warehouse."""
+    global _boards_repository
+    with _boards_repository_lock:
+        if _boards_repository is not None:
+            _boards_repository.close()
+            _boards_repository = None
@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import hashlib
+
 import aiofiles
+import aiofiles.os
 from datetime import UTC, datetime
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
 from fastapi import UploadFile
@@ -14,6 +18,24 @@ from pluto_duck_backend.app.core.config import get_settings
 from pluto_duck_backend.app.services.boards.repository import BoardsRepository
 from pluto_duck_backend.app.services.duckdb_utils import connect_warehouse
 
+# Bytes read per chunk when streaming an upload to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+def _snapshot_rows(snapshot: Dict[str, Any], limit: Optional[int]) -> List[Dict[str, Any]]:
+    """Build up to ``limit`` row dicts from a stored result snapshot.
+
+    Snapshots are stored column-wise (``columns_data``); older ones still
+    carry a row-wise ``data`` list.
+    """
+    if "columns_data" not in snapshot:
+        return snapshot.get("data", [])[:limit]
+    columns = snapshot["columns"]
+    return [
+        dict(zip(columns, values))
+        for values in islice(zip(*snapshot["columns_data"]), limit)
+    ]
+
 
 class BoardsService:
     """Service for board operations including query execution."""
@@ -25,13 +47,16 @@ class BoardsService:
         # Asset storage path (configurable)
         self.asset_storage_path = Path.home() / ".pluto_duck" / "assets"
 
-    async def execute_query(self, query_id: str, project_id: str) -> Dict[str, Any]:
+    async def execute_query(
+        self, query_id: str, project_id: str, limit: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
         Execute stored query, enforce project scope, cache results.
         
         Args:
             query_id: Query ID to execute
             project_id: Project ID for permission check
+            limit: Maximum number of rows to return (all rows are cached)
             
         Returns:
             Query result snapshot with columns and data
@@ -40,46 +65,50 @@ class BoardsService:
             ValueError: If query not found
             PermissionError: If query doesn't belong to project
         """
-        # Get query
-        query = self.repo.get_query(query_id)
-        if not query:
+        # Get query with its owners resolved in one join: query -> item -> board -> project
+        owned = self.repo.get_query_with_owner(query_id)
+        if not owned:
             raise ValueError("Query not found")
 
-        # Verify board ownership by traversing: query -> item -> board -> project
-        item = self.repo.get_item(query.board_item_id)
-        if not item:
+        query, board_id, owner_project_id = owned
+        if board_id is None:
             raise ValueError("Board item not found")
 
-        board = self.repo.get_board(item.board_id)
-        if not board:
+        if owner_project_id is None:
             raise ValueError("Board not found")
 
-        if board.project_id != project_id:
+        if owner_project_id != project_id:
             raise PermissionError("Query does not belong to this project")
 
         # Execute against DuckDB
         try:
             with connect_warehouse(self.warehouse_path) as con:
-                result = con.execute(query.query_text).fetchall()
-                columns = [desc[0] for desc in con.description] if con.description else []
+                table = con.execute(query.query_text).fetch_arrow_table()
 
-            # Create snapshot
+            # Persist a column-wise snapshot; row dicts are only built for the response
+            executed_at = datetime.now(UTC).isoformat()
             snapshot = {
-                "columns": columns,
-                "data": [dict(zip(columns, row)) for row in result],
-                "row_count": len(result),
-                "executed_at": datetime.now(UTC).isoformat(),
+                "columns": table.column_names,
+                "columns_data": [column.to_pylist() for column in table.columns],
+                "row_count": table.num_rows,
+                "executed_at": executed_at,
             }
 
             # Update query with result (cache)
             self.repo.update_query_result(
                 query_id=query_id,
                 result=snapshot,
-                rows=len(result),
+                rows=table.num_rows,
                 status="success",
             )
 
-            return snapshot
+            rows = table if limit is None else table.slice(0, limit)
+            return {
+                "columns": table.column_names,
+                "data": rows.to_pylist(),
+                "row_count": table.num_rows,
+                "executed_at": executed_at,
+            }
 
         except Exception as e:
             # Update query with error
@@ -92,16 +121,20 @@ class BoardsService:
             )
             raise
 
-    async def get_cached_result(self, query_id: str) -> Dict[str, Any] | None:
+    async def get_cached_result(
+        self, query_id: str, limit: Optional[int] = None
+    ) -> Dict[str, Any] | None:
         """Get cached query result without re-execution."""
-        query = self.repo.get_query(query_id)
-        if not query:
+        snapshot = self.repo.get_cached_snapshot(query_id)
+        if not snapshot:
             return None
 
-        if query.last_result_snapshot:
-            return query.last_result_snapshot
-
-        return None
+        return {
+            "columns": snapshot.get("columns", []),
+            "data": _snapshot_rows(snapshot, limit),
+            "row_count": snapshot.get("row_count", 0),
+            "executed_at": snapshot.get("executed_at", ""),
+        }
 
     async def upload_asset(
         self,
@@ -129,30 +162,41 @@ class BoardsService:
             raise ValueError("Only image uploads are supported")
 
         # Verify item ownership
-        item = self.repo.get_item(item_id)
-        if not item:
+        owner = self.repo.get_item_owner(item_id)
+        if not owner:
             raise ValueError("Board item not found")
 
-        board = self.repo.get_board(item.board_id)
-        if not board:
+        _, owner_project_id = owner
+        if owner_project_id is None:
             raise ValueError("Board not found")
 
-        if board.project_id != project_id:
+        if owner_project_id != project_id:
             raise PermissionError("Item does not belong to this project")
 
-        # Generate unique filename
         file_ext = Path(file.filename or "image.png").suffix
-        unique_name = f"{uuid4()}{file_ext}"
+        self.asset_storage_path.mkdir(parents=True, exist_ok=True)
 
-        # Storage path
-        # Example: ~/.pluto_duck/assets/abc-123-def.png
-        storage_path = self.asset_storage_path / unique_name
-        storage_path.parent.mkdir(parents=True, exist_ok=True)
+        # Stream to a temporary file (binary data stored here, NOT in DB)
+        temp_path = self.asset_storage_path / f"{uuid4()}{file_ext}.part"
+        file_size = 0
+        hasher = hashlib.sha256()
+        try:
+            async with aiofiles.open(temp_path, "wb") as f:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    file_size += len(chunk)
+                    hasher.update(chunk)
+                    await f.write(chunk)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
 
-        # Save file to disk (binary data stored here, NOT in DB)
-        content = await file.read()
-        async with aiofiles.open(storage_path, "wb") as f:
-            await f.write(content)
+        # Name the file by its digest so identical re-uploads share one copy
+        # Example: ~/.pluto_duck/assets/9f86d08...15a.png
+        storage_path = self.asset_storage_path / f"{hasher.hexdigest()}{file_ext}"
+        if await aiofiles.os.path.exists(storage_path):
+            await aiofiles.os.remove(temp_path)
+        else:
+            await aiofiles.os.replace(temp_path, storage_path)
 
         # Create asset record (only metadata in DB)
         asset_id = self.repo.create_asset(
@@ -160,7 +204,7 @@ class BoardsService:
             asset_type="image",
             file_name=file.filename or "image.png",
             file_path=str(storage_path),  # Path only, not binary
-            file_size=len(content),
+            file_size=file_size,
             mime_type=file.content_type,
         )
 
@@ -169,7 +213,7 @@ class BoardsService:
         return {
             "asset_id": asset_id,
             "file_name": file.filename,
-            "file_size": len(content),
+            "file_size": file_size,
             "mime_type": file.content_type,
             "url": f"/api/v1/boards/assets/{asset_id}/download",
         }
@@ -17,7 +17,6 @@ from pluto_duck_backend.app.core.config import get_settings
 from pluto_duck_backend.app.services.duckdb_utils import connect_warehouse
 
 _table_init_lock = threading.Lock()
-_duckdb_write_lock = threading.RLock()
 
 # Retry settings for occasional DuckDB write-write conflicts (e.g., concurrent writers)
 _WRITE_RETRY_ATTEMPTS = 5
@@ -205,6 +204,10 @@ DDL_STATEMENTS = [
     """
     CREATE INDEX IF NOT EXISTS idx_items_board ON board_items(board_id, position_y, position_x)
     """,
+    # Single-column index so board_id filters (list/cascade paths) can use an index scan
+    """
+    CREATE INDEX IF NOT EXISTS idx_items_board_id ON board_items(board_id)
+    """,
     """
     CREATE TABLE IF NOT EXISTS board_queries (
         id UUID PRIMARY KEY,
@@ -364,9 +367,8 @@ class ChatRepository:
     @contextmanager
     def _write_connection(self) -> duckdb.DuckDBPyConnection:
         """Serialize DuckDB writes within a process and provide a connection."""
-        with _duckdb_write_lock:
-            with self._connect() as con:
-                yield con
+        with connect_warehouse(self.warehouse_path, write=True) as con:
+            yield con
 
     def _is_write_conflict(self, exc: Exception) -> bool:
         msg = str(exc)
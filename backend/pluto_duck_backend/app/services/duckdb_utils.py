@@ -1,23 +1,124 @@
 from __future__ import annotations
 
+import os
+import queue
+import threading
 from contextlib import contextmanager
 from pathlib import Path
-import threading
+from typing import Any, Dict, Iterator
 
 import duckdb
 
-_duckdb_conn_lock = threading.RLock()
+# Idle cursors kept per warehouse; busier moments get short-lived extra cursors
+POOL_SIZE = min(os.cpu_count() or 1, 4)
 
 
-@contextmanager
-def connect_warehouse(path: Path):
-    """Serialize DuckDB connections to avoid unique file handle conflicts."""
-    with _duckdb_conn_lock:
-        con = duckdb.connect(str(path))
+class _WarehousePool:
+    """One root DuckDB connection per file plus a bounded set of idle cursors."""
+
+    def __init__(self, path: Path) -> None:
+        self._root = duckdb.connect(str(path))
+        # Per-instance bookkeeping for callers, dropped together with the pool
+        self.state: Dict[str, Any] = {}
+        # Writers take turns; concurrent DuckDB write transactions can fail
+        # with conflicts instead of waiting for each other
+        self.write_lock = threading.RLock()
+        self._idle: queue.Queue[duckdb.DuckDBPyConnection] = queue.Queue(maxsize=POOL_SIZE)
+        for _ in range(POOL_SIZE):
+            self._idle.put_nowait(self._root.cursor())
+
+    def acquire(self) -> duckdb.DuckDBPyConnection:
         try:
-            yield con
-        finally:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            # Never block: nested or highly concurrent callers get an extra cursor
+            return self._root.cursor()
+
+    def release(self, con: duckdb.DuckDBPyConnection, failed: bool) -> None:
+        if failed:
+            # Don't hand a cursor stuck in an aborted transaction to the next caller
             try:
-                con.close()
-            except Exception:
+                con.rollback()
+            except duckdb.Error:
                 pass
+        try:
+            self._idle.put_nowait(con)
+        except queue.Full:
+            con.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self._root.close()
+
+
+_pools: Dict[str, _WarehousePool] = {}
+_pools_lock = threading.Lock()
+
+
+# Shared in-memory warehouse (e.g. tests that don't need the data on disk)
+MEMORY_WAREHOUSE = ":memory:"
+
+
+def _get_pool(path: Path) -> _WarehousePool:
+    key = str(path)
+    if key != MEMORY_WAREHOUSE:
+        key = str(Path(path).resolve())
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _WarehousePool(Path(key))
+                _pools[key] = pool
+    return pool
+
+
+@contextmanager
+def connect_warehouse(path: Path, write: bool = False) -> Iterator[duckdb.DuckDBPyConnection]:
+    """Borrow a pooled DuckDB cursor for the warehouse at ``path``.
+
+    Cursors share one database instance, so concurrent readers run in
+    parallel. Pass ``write=True`` for work that modifies the warehouse: it
+    holds the warehouse's write lock, so writers in this process are
+    serialized rather than failing with transaction conflicts.
+    """
+    pool = _get_pool(path)
+    if write:
+        with pool.write_lock:
+            with connect_warehouse(path) as con:
+                yield con
+        return
+    con = pool.acquire()
+    failed = False
+    try:
+        yield con
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        pool.release(con, failed)
+
+
+def warehouse_state(path: Path) -> Dict[str, Any]:
+    """Scratch state that lives exactly as long as the pooled instance for ``path``.
+
+    Use it for facts about the instance itself (e.g. which databases are
+    ATTACHed) so they are forgotten when the pool is closed.
+    """
+    return _get_pool(path).state
+
+
+def close_warehouse_pools() -> None:
+    """Close every pooled warehouse connection (e.g. before deleting the file)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        try:
+            pool.close()
+        except Exception:
+            pass
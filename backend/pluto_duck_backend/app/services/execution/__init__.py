@@ -1,7 +1,12 @@
 """Query execution services for Pluto-Duck."""
 
 from .manager import QueryExecutionManager, get_execution_manager
-from .service import QueryExecutionService, QueryJob, QueryJobStatus
+from .service import (
+    QueryExecutionService,
+    QueryJob,
+    QueryJobStatus,
+    reset_query_history_schema,
+)
 
 __all__ = [
     "QueryExecutionService",
@@ -9,5 +14,6 @@ __all__ = [
     "QueryJobStatus",
     "QueryExecutionManager",
     "get_execution_manager",
+    "reset_query_history_schema",
 ]
 
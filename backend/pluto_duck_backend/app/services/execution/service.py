@@ -2,16 +2,74 @@
 
 from __future__ import annotations
 
+import re
+import threading
+import time
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Set
 
 import duckdb
 
 from pluto_duck_backend.app.services.duckdb_utils import connect_warehouse
 
+SUBMIT_SQL = (
+    "INSERT OR REPLACE INTO query_history (job_id, sql, status, submitted_at) "
+    "VALUES (?, ?, ?, make_timestamp(?))"
+)
+GET_JOB_SQL = "SELECT sql, submitted_at FROM query_history WHERE job_id = ?"
+MARK_SUCCESS_SQL = (
+    "UPDATE query_history SET status=?, completed_at=make_timestamp(?), result_relation=?, "
+    "error=NULL, rows_affected=? WHERE job_id=?"
+)
+MARK_FAILED_SQL = (
+    "UPDATE query_history SET status=?, completed_at=make_timestamp(?), error=?, "
+    "rows_affected=NULL "
+    "WHERE job_id=?"
+)
+FETCH_SQL = (
+    "SELECT job_id, sql, status, submitted_at, completed_at, result_relation, error, "
+    "rows_affected FROM query_history WHERE job_id=?"
+)
+DELETE_STALE_SQL = (
+    "DELETE FROM query_history "
+    "WHERE completed_at IS NOT NULL AND completed_at < make_timestamp(?) "
+    "RETURNING result_relation"
+)
+
+# Matches only the leading keyword, so no uppercased copy of the whole query is made
+_DDL_RE = re.compile(r"\s*(?:CREATE|ALTER|DROP|TRUNCATE|ATTACH|DETACH)\s", re.IGNORECASE)
+# Anything that can't appear in an unquoted result table name
+_RELATION_UNSAFE_RE = re.compile(r"[^A-Za-z0-9_]+")
+
+# Warehouses whose query_history schema has been ensured by this process
+_schema_ready: Set[str] = set()
+_schema_lock = threading.Lock()
+
+
+def reset_query_history_schema() -> None:
+    """Forget ensured schemas so they are recreated (e.g. after a database reset)."""
+    with _schema_lock:
+        _schema_ready.clear()
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def _now_us() -> int:
+    """Current UTC time as epoch microseconds, bound via make_timestamp(?).
+
+    Binding an aware datetime would be stored in the host's local time zone.
+    """
+    return time.time_ns() // 1000
+
+
+def _from_us(micros: int) -> datetime:
+    """Convert epoch microseconds to an aware UTC datetime."""
+    return _EPOCH + timedelta(microseconds=micros)
+
 
 class QueryJobStatus(str, Enum):
     PENDING = "pending"
@@ -37,55 +95,74 @@ class QueryExecutionService:
 
     def __init__(self, warehouse_path: Path):
         self.warehouse_path = warehouse_path
+        # Parsed statements are connection-independent, so any pooled cursor can run them
+        self._statements: Dict[str, duckdb.Statement] = {}
         self._ensure_tables()
 
+    def _exec(
+        self, con: duckdb.DuckDBPyConnection, sql: str, params: List[Any]
+    ) -> duckdb.DuckDBPyConnection:
+        """Execute a fixed statement, parsing it only on first use."""
+        statement = self._statements.get(sql)
+        if statement is None:
+            statement = con.extract_statements(sql)[0]
+            self._statements[sql] = statement
+        return con.execute(statement, params)
+
     def _ensure_tables(self) -> None:
-        with connect_warehouse(self.warehouse_path) as con:
-            con.execute(
-                """
-                CREATE TABLE IF NOT EXISTS query_history (
-                    job_id TEXT PRIMARY KEY,
-                    sql TEXT,
-                    status TEXT,
-                    submitted_at TIMESTAMP,
-                    completed_at TIMESTAMP,
-                    result_relation TEXT,
-                    error TEXT,
-                    rows_affected BIGINT
+        key = str(self.warehouse_path)
+        if key in _schema_ready:
+            return
+        with _schema_lock:
+            if key in _schema_ready:
+                return
+            with connect_warehouse(self.warehouse_path, write=True) as con:
+                con.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS query_history (
+                        job_id TEXT PRIMARY KEY,
+                        sql TEXT,
+                        status TEXT,
+                        submitted_at TIMESTAMP,
+                        completed_at TIMESTAMP,
+                        result_relation TEXT,
+                        error TEXT,
+                        rows_affected BIGINT
+                    )
+                    """
                 )
-                """
-            )
-            columns = {row[0] for row in con.execute("DESCRIBE query_history").fetchall()}
-            if "rows_affected" not in columns:
-                con.execute("ALTER TABLE query_history ADD COLUMN rows_affected BIGINT")
+                # Migrate tables created before rows_affected existed
+                con.execute(
+                    "ALTER TABLE query_history ADD COLUMN IF NOT EXISTS rows_affected BIGINT"
+                )
+            _schema_ready.add(key)
 
     def _sanitize_relation(self, run_id: str) -> str:
-        sanitized = "".join(ch for ch in run_id if ch.isalnum() or ch == "_")
-        if not sanitized:
-            sanitized = "result"
+        sanitized = _RELATION_UNSAFE_RE.sub("", run_id) or "result"
         return f"query_result_{sanitized}"
 
     def _is_ddl_statement(self, sql: str) -> bool:
         """Check if the SQL is a DDL statement (CREATE, ALTER, DROP, etc.)."""
-        normalized = sql.strip().upper()
-        ddl_keywords = ('CREATE ', 'ALTER ', 'DROP ', 'TRUNCATE ', 'ATTACH ', 'DETACH ')
-        return any(normalized.startswith(kw) for kw in ddl_keywords)
+        return _DDL_RE.match(sql) is not None
 
     def submit(self, run_id: str, sql: str) -> QueryJob:
-        submitted_at = datetime.now(UTC)
-        with connect_warehouse(self.warehouse_path) as con:
-            con.execute(
-                "INSERT OR REPLACE INTO query_history (job_id, sql, status, submitted_at) VALUES (?, ?, ?, ?)",
-                [run_id, sql, QueryJobStatus.PENDING.value, submitted_at],
+        submitted_us = _now_us()
+        with connect_warehouse(self.warehouse_path, write=True) as con:
+            self._exec(
+                con,
+                SUBMIT_SQL,
+                [run_id, sql, QueryJobStatus.PENDING.value, submitted_us],
             )
-        return QueryJob(run_id=run_id, sql=sql, status=QueryJobStatus.PENDING, submitted_at=submitted_at)
+        return QueryJob(
+            run_id=run_id,
+            sql=sql,
+            status=QueryJobStatus.PENDING,
+            submitted_at=_from_us(submitted_us),
+        )
 
     def execute(self, run_id: str) -> QueryJob:
-        with connect_warehouse(self.warehouse_path) as con:
-            row = con.execute(
-                "SELECT sql, submitted_at FROM query_history WHERE job_id = ?",
-                [run_id],
-            ).fetchone()
+        with connect_warehouse(self.warehouse_path, write=True) as con:
+            row = self._exec(con, GET_JOB_SQL, [run_id]).fetchone()
             if not row:
                 raise ValueError(f"Unknown run_id {run_id}")
             sql, submitted_at = row
@@ -100,30 +177,38 @@ class QueryExecutionService:
                     # For DDL, no result table is created
                     result_relation = None
                 else:
-                    # For SELECT queries, wrap in CREATE TABLE AS
-                    con.execute(f"CREATE OR REPLACE TABLE {result_relation} AS {sql}")
-                    rows_affected = con.execute(f"SELECT COUNT(*) FROM {result_relation}").fetchone()[0]
+                    # For SELECT queries, wrap in CREATE TABLE AS; DuckDB reports the
+                    # inserted row count as the statement result, so no rescan is needed
+                    created = con.execute(f"CREATE OR REPLACE TABLE {result_relation} AS {sql}")
+                    rows_affected = created.fetchone()[0] if con.description else None
                 
-                completed_at = datetime.now(UTC)
-                con.execute(
-                    "UPDATE query_history SET status=?, completed_at=?, result_relation=?, error=NULL, rows_affected=? WHERE job_id=?",
-                    [QueryJobStatus.SUCCESS.value, completed_at, result_relation, rows_affected, run_id],
+                completed_us = _now_us()
+                self._exec(
+                    con,
+                    MARK_SUCCESS_SQL,
+                    [QueryJobStatus.SUCCESS.value, completed_us, result_relation, rows_affected, run_id],
                 )
             except duckdb.Error as exc:
-                completed_at = datetime.now(UTC)
-                con.execute(
-                    "UPDATE query_history SET status=?, completed_at=?, error=?, rows_affected=NULL WHERE job_id=?",
-                    [QueryJobStatus.FAILED.value, completed_at, str(exc), run_id],
+                self._exec(
+                    con,
+                    MARK_FAILED_SQL,
+                    [QueryJobStatus.FAILED.value, _now_us(), str(exc), run_id],
                 )
                 raise
-        return self.fetch(run_id)  # type: ignore[return-value]
+        # Every field is already known here, so skip re-reading the row via fetch()
+        return QueryJob(
+            run_id=run_id,
+            sql=sql,
+            status=QueryJobStatus.SUCCESS,
+            submitted_at=submitted_at,
+            completed_at=_from_us(completed_us),
+            result_table=result_relation,
+            rows_affected=rows_affected,
+        )
 
     def fetch(self, run_id: str) -> Optional[QueryJob]:
         with connect_warehouse(self.warehouse_path) as con:
-            row = con.execute(
-                "SELECT job_id, sql, status, submitted_at, completed_at, result_relation, error, rows_affected FROM query_history WHERE job_id=?",
-                [run_id],
-            ).fetchone()
+            row = self._exec(con, FETCH_SQL, [run_id]).fetchone()
         if not row:
             return None
         submitted_at = row[3]
@@ -152,26 +237,24 @@ class QueryExecutionService:
         removed from ``query_history``.
         """
 
-        cutoff = datetime.now(UTC) - timedelta(hours=older_than_hours)
-        removed_rows = 0
-        with connect_warehouse(self.warehouse_path) as con:
-            stale_rows = con.execute(
-                "SELECT job_id, result_relation FROM query_history WHERE completed_at IS NOT NULL AND completed_at < ?",
-                [cutoff],
-            ).fetchall()
-
-            for job_id, relation in stale_rows:
-                if relation:
-                    try:
-                        con.execute(f"DROP TABLE IF EXISTS {relation}")
-                    except duckdb.Error:
-                        # Ignore drop failures to avoid stopping the cleanup.
-                        pass
-
-            removed_rows = con.execute(
-                "DELETE FROM query_history WHERE completed_at IS NOT NULL AND completed_at < ?",
-                [cutoff],
-            ).rowcount
+        cutoff = _now_us() - older_than_hours * 3_600_000_000
+        with connect_warehouse(self.warehouse_path, write=True) as con:
+            removed = self._exec(con, DELETE_STALE_SQL, [cutoff]).fetchall()
+            relations = [relation for (relation,) in removed if relation]
+            if relations:
+                # Relation names come from _sanitize_relation, so they are safe to inline
+                try:
+                    con.execute(
+                        ";\n".join(f"DROP TABLE IF EXISTS {relation}" for relation in relations)
+                    )
+                except duckdb.Error:
+                    # Retry one by one so a single bad drop doesn't stop the cleanup.
+                    for relation in relations:
+                        try:
+                            con.execute(f"DROP TABLE IF EXISTS {relation}")
+                        except duckdb.Error:
+                            pass
+            removed_rows = len(removed)
         return removed_rows
 
 
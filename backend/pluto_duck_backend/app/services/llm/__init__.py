@@ -21,13 +21,15 @@ from .schemas import (
     IssueItemSchema,
     PotentialItemSchema,
 )
-from .service import LLMService, get_llm_service
+from .service import LLMService, TokenUsage, get_llm_service, invalidate_llm_settings
 from .settings import LLMSettings
 
 __all__ = [
     "LLMService",
     "LLMSettings",
+    "TokenUsage",
     "get_llm_service",
+    "invalidate_llm_settings",
     "BatchAnalysisSchema",
     "FileAnalysisSchema",
     "IssueItemSchema",
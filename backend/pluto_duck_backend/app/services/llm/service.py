@@ -6,12 +6,17 @@ using LangChain for provider-agnostic model access.
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import weakref
+from dataclasses import dataclass
 from functools import lru_cache
-from typing import Optional, Type, TypeVar
+from typing import Any, Dict, Optional, Tuple, Type, TypeVar
 
+import httpx
 from langchain_core.language_models import BaseChatModel
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import Runnable
 from pydantic import BaseModel
 
 from .settings import LLMSettings
@@ -20,6 +25,124 @@ T = TypeVar("T", bound=BaseModel)
 
 logger = logging.getLogger(__name__)
 
+# Over HTTP/2 concurrent requests multiplex on one pooled connection instead of
+# paying a TCP+TLS handshake each; servers that only speak HTTP/1.1 get one
+# connection per in-flight request from the pool (httpx's default sizes).
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+# Transient failures (connection errors, timeouts, 429 and 5xx responses) are
+# retried by the OpenAI client with jittered exponential backoff
+MAX_RETRIES = 3
+
+
+@dataclass
+class TokenUsage:
+    """Tokens used by one caller's requests, counted apart from the service total."""
+
+    total_tokens: int = 0
+
+
+# Bumped whenever stored LLM settings change so cached settings are re-read
+_settings_version = 0
+
+
+def invalidate_llm_settings() -> None:
+    """Force every LLMService to re-resolve its settings on next use."""
+    global _settings_version
+    _settings_version += 1
+
+
+@lru_cache(maxsize=1)
+def _load_settings(version: int) -> LLMSettings:
+    """Resolve settings once per settings version."""
+    return LLMSettings.from_config()
+
+
+# Models built on each event loop. A model's httpx.AsyncClient is tied to the
+# loop it first runs on, so models are never shared across loops, and a loop's
+# entries go away with the loop.
+_loop_caches: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Any, Any]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _loop_cache() -> Optional[Dict[Any, Any]]:
+    """Model cache for the running event loop, or None when no loop is running."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    cache = _loop_caches.get(loop)
+    if cache is None:
+        cache = _loop_caches[loop] = {}
+    return cache
+
+
+def _build_chat_model(
+    provider: str,
+    model: str,
+    api_key: str,
+    api_base: Optional[str],
+) -> BaseChatModel:
+    """Build a chat model once per configuration and event loop.
+
+    Each cached model owns an HTTP/2-capable client and its connection pool,
+    so requests on the same loop with the same configuration reuse warm
+    connections. Outside a running loop a fresh model is returned, since it
+    may later be driven by any loop.
+    """
+    cache = _loop_cache()
+    key = (provider, model, api_key, api_base)
+    chat_model = cache.get(key) if cache is not None else None
+    if chat_model is None:
+        chat_model = _new_chat_model(*key)
+        if cache is not None:
+            cache[key] = chat_model
+    return chat_model
+
+
+def _new_chat_model(
+    provider: str,
+    model: str,
+    api_key: str,
+    api_base: Optional[str],
+) -> BaseChatModel:
+    """Create a chat model with its own HTTP client."""
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=model,
+        api_key=api_key,
+        base_url=api_base,
+        max_retries=MAX_RETRIES,
+        http_async_client=httpx.AsyncClient(
+            http2=True,
+            limits=HTTP_LIMITS,
+            timeout=HTTP_TIMEOUT,
+        ),
+    )
+
+
+def _build_structured_model(
+    model_key: Tuple[str, str, str, Optional[str]],
+    response_schema: Type[BaseModel],
+) -> Runnable:
+    """Wrap a cached chat model for a schema once per event loop, reusing the JSON schema."""
+    cache = _loop_cache()
+    key = (model_key, response_schema)
+    structured = cache.get(key) if cache is not None else None
+    if structured is None:
+        structured = _build_chat_model(*model_key).with_structured_output(
+            response_schema,
+            method="json_schema",
+            strict=True,
+            include_raw=True,
+        )
+        if cache is not None:
+            cache[key] = structured
+    return structured
+
 
 class LLMService:
     """Unified LLM service for all LLM interactions.
@@ -43,6 +166,8 @@ class LLMService:
         """
         self._model_override = model_override
         self._settings: Optional[LLMSettings] = None
+        self._settings_version = -1
+        self._total_tokens_used = 0
 
     def _resolve_settings(self) -> LLMSettings:
         """Resolve and cache LLM settings.
@@ -50,8 +175,9 @@ class LLMService:
         Returns:
             LLMSettings with resolved configuration
         """
-        if self._settings is None:
-            self._settings = LLMSettings.from_config()
+        if self._settings is None or self._settings_version != _settings_version:
+            self._settings_version = _settings_version
+            self._settings = _load_settings(_settings_version)
             if self._model_override:
                 self._settings = LLMSettings(
                     provider=self._settings.provider,
@@ -61,11 +187,24 @@ class LLMService:
                 )
         return self._settings
 
-    def get_chat_model(self) -> BaseChatModel:
-        """Get a LangChain BaseChatModel for chat/tool-calling.
+    def _record_usage(self, message: object, usage: Optional[TokenUsage] = None) -> None:
+        """Add the token usage reported on an AI message to the running total.
+
+        Args:
+            message: Raw model response (usage is skipped if not reported)
+            usage: Optional per-caller counter that is also credited
+        """
+        if isinstance(message, AIMessage) and message.usage_metadata:
+            tokens = message.usage_metadata.get("total_tokens", 0)
+            self._total_tokens_used += tokens
+            if usage is not None:
+                usage.total_tokens += tokens
+
+    def _chat_model_key(self) -> Tuple[str, str, str, Optional[str]]:
+        """Resolve the configuration a chat model is built (and cached) for.
 
         Returns:
-            BaseChatModel instance (currently ChatOpenAI)
+            Tuple of (provider, model, api_key, api_base)
 
         Raises:
             RuntimeError: If API key is not configured or provider is unsupported
@@ -73,25 +212,30 @@ class LLMService:
         settings = self._resolve_settings()
 
         if settings.provider == "openai":
-            from langchain_openai import ChatOpenAI
-
             if not settings.api_key:
                 raise RuntimeError(
                     "OpenAI API key is not configured. "
                     "Set it in Settings (llm_api_key) or via OPENAI_API_KEY."
                 )
 
-            return ChatOpenAI(
-                model=settings.model,
-                api_key=settings.api_key,
-                base_url=settings.api_base,
-            )
+            return (settings.provider, settings.model, settings.api_key, settings.api_base)
 
         raise RuntimeError(
             f"LLM provider '{settings.provider}' is not supported yet. "
             "Use provider 'openai'."
         )
 
+    def get_chat_model(self) -> BaseChatModel:
+        """Get a LangChain BaseChatModel for chat/tool-calling.
+
+        Returns:
+            BaseChatModel instance (currently ChatOpenAI)
+
+        Raises:
+            RuntimeError: If API key is not configured or provider is unsupported
+        """
+        return _build_chat_model(*self._chat_model_key())
+
     async def complete(self, prompt: str) -> str:
         """Complete a prompt and return text response.
 
@@ -103,12 +247,14 @@ class LLMService:
         """
         chat_model = self.get_chat_model()
         response = await chat_model.ainvoke([HumanMessage(content=prompt)])
+        self._record_usage(response)
         return str(response.content)
 
     async def complete_structured(
         self,
         prompt: str,
         response_schema: Type[T],
+        usage: Optional[TokenUsage] = None,
     ) -> T:
         """Complete a prompt with structured output.
 
@@ -118,18 +264,23 @@ class LLMService:
         Args:
             prompt: The prompt to send to the LLM
             response_schema: Pydantic model class for the expected response
+            usage: Optional counter credited with this call's tokens, so
+                concurrent callers can track their own spend
 
         Returns:
             Instance of response_schema with LLM's structured response
         """
-        chat_model = self.get_chat_model()
-        structured_model = chat_model.with_structured_output(
-            response_schema,
-            method="json_schema",
-            strict=True,
-        )
+        structured_model = _build_structured_model(self._chat_model_key(), response_schema)
         result = await structured_model.ainvoke([HumanMessage(content=prompt)])
-        return result  # type: ignore[return-value]
+        self._record_usage(result["raw"], usage)
+        if result["parsing_error"] is not None:
+            raise result["parsing_error"]
+        return result["parsed"]  # type: ignore[return-value]
+
+    @property
+    def total_tokens_used(self) -> int:
+        """Get the total tokens reported by the provider for this service."""
+        return self._total_tokens_used
 
     @property
     def model_name(self) -> str:
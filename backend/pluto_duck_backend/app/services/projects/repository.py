@@ -1,195 +1,304 @@
 from __future__ import annotations
 
-import json
-from datetime import UTC, datetime
+import copy
+import threading
+from contextlib import contextmanager
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import uuid4
+
+import duckdb
+import orjson
 
 from pluto_duck_backend.app.core.config import get_settings
+from pluto_duck_backend.app.services.boards.repository import clear_boards_caches
 from pluto_duck_backend.app.services.duckdb_utils import connect_warehouse
 
+# DuckDB foreign keys cannot ON DELETE CASCADE (and block deleting referenced
+# parents), so the cascade is declared here, ordered children before parents.
+# Each level joins to its ancestors with USING so it is one set-based statement.
+PROJECT_CASCADE_SQL = (
+    """
+    DELETE FROM board_item_assets
+    USING board_items i, boards b
+    WHERE board_item_assets.board_item_id = i.id
+      AND i.board_id = b.id AND b.project_id = ?
+    """,
+    """
+    DELETE FROM board_queries
+    USING board_items i, boards b
+    WHERE board_queries.board_item_id = i.id
+      AND i.board_id = b.id AND b.project_id = ?
+    """,
+    """
+    DELETE FROM board_items
+    USING boards b
+    WHERE board_items.board_id = b.id AND b.project_id = ?
+    """,
+    "DELETE FROM boards WHERE project_id = ?",
+    """
+    DELETE FROM agent_messages
+    USING agent_conversations c
+    WHERE agent_messages.conversation_id = c.id AND c.project_id = ?
+    """,
+    """
+    DELETE FROM agent_events
+    USING agent_conversations c
+    WHERE agent_events.conversation_id = c.id AND c.project_id = ?
+    """,
+    "DELETE FROM agent_conversations WHERE project_id = ?",
+    """
+    DELETE FROM data_source_tables
+    USING data_sources s
+    WHERE data_source_tables.data_source_id = s.id AND s.project_id = ?
+    """,
+    "DELETE FROM data_sources WHERE project_id = ?",
+)
+
+# Statements parsed once per repository (see ProjectRepository._exec)
+GET_PROJECT_SQL = """
+    SELECT id, name, description, created_at, updated_at, settings, is_default
+    FROM projects
+    WHERE id = ?
+    """
+
+_LIST_PROJECTS_TEMPLATE = """
+    WITH board_counts AS (
+        SELECT project_id, COUNT(*) AS n FROM boards GROUP BY project_id
+    ),
+    conversation_counts AS (
+        SELECT project_id, COUNT(*) AS n FROM agent_conversations GROUP BY project_id
+    )
+    SELECT 
+        p.id::VARCHAR as id, p.name, p.description, p.created_at, p.updated_at, 
+        {settings} as settings, p.is_default,
+        COALESCE(b.n, 0) as board_count,
+        COALESCE(c.n, 0) as conversation_count
+    FROM projects p
+    LEFT JOIN board_counts b ON b.project_id = p.id
+    LEFT JOIN conversation_counts c ON c.project_id = p.id
+    ORDER BY p.is_default DESC, p.updated_at DESC
+    """
+
+LIST_PROJECTS_SQL = _LIST_PROJECTS_TEMPLATE.format(settings="p.settings")
+
+# Same listing without reading the (possibly large) settings documents
+LIST_PROJECT_SUMMARIES_SQL = _LIST_PROJECTS_TEMPLATE.format(settings="NULL")
+
+INSERT_PROJECT_SQL = """
+    INSERT INTO projects (id, name, description, is_default, created_at, updated_at, settings)
+    VALUES (
+        ?, ?, ?, FALSE,
+        CURRENT_TIMESTAMP AT TIME ZONE 'UTC', CURRENT_TIMESTAMP AT TIME ZONE 'UTC', '{}'
+    )
+    """
+
+GET_SETTINGS_SQL = "SELECT settings FROM projects WHERE id = ?"
+
+UPDATE_SETTINGS_SQL = """
+    UPDATE projects
+    SET settings = ?, updated_at = CURRENT_TIMESTAMP AT TIME ZONE 'UTC'
+    WHERE id = ?
+    """
+
+DELETE_PROJECT_SQL = "DELETE FROM projects WHERE id = ? AND is_default IS NOT TRUE RETURNING id"
+
+IS_DEFAULT_SQL = "SELECT is_default FROM projects WHERE id = ?"
+
+
+def _loads_settings(value: Optional[str]) -> Dict[str, Any]:
+    """Decode a settings document, skipping the parser for empty settings."""
+    if not value or value == "{}":
+        return {}
+    return orjson.loads(value)
+
 
 class ProjectRepository:
     def __init__(self, warehouse_path: Path) -> None:
         self.warehouse_path = warehouse_path
+        # Projects are only modified through this repository, so cached rows
+        # stay valid until one of our own writes drops them. The version lets
+        # a read that raced with a write skip storing what it fetched.
+        self._project_cache: Dict[str, Dict[str, Any]] = {}
+        self._cache_version = 0
+        self._cache_lock = threading.Lock()
+        self._statements: Dict[str, duckdb.Statement] = {}
 
-    def _connect(self):
-        return connect_warehouse(self.warehouse_path)
+    def _connect(self, write: bool = False):
+        return connect_warehouse(self.warehouse_path, write=write)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Run several statements atomically on one connection."""
+        with self._connect(write=True) as con:
+            con.execute("BEGIN TRANSACTION")
+            try:
+                yield con
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+            con.execute("COMMIT")
+
+    def _exec(
+        self, con: duckdb.DuckDBPyConnection, sql: str, params: List[Any]
+    ) -> duckdb.DuckDBPyConnection:
+        """Execute a fixed statement, parsing it only on first use."""
+        statement = self._statements.get(sql)
+        if statement is None:
+            statement = con.extract_statements(sql)[0]
+            self._statements[sql] = statement
+        return con.execute(statement, params)
 
     def _generate_uuid(self) -> str:
-        from uuid import uuid4
         return str(uuid4())
 
+    def _invalidate_project(self, project_id: str) -> None:
+        """Drop a project's cached row after it was written."""
+        with self._cache_lock:
+            self._project_cache.pop(project_id, None)
+            self._cache_version += 1
+
     def get_project(self, project_id: str) -> Optional[Dict[str, Any]]:
         """Get project details by ID."""
+        with self._cache_lock:
+            cached = self._project_cache.get(project_id)
+            if cached is not None:
+                return copy.deepcopy(cached)
+            version = self._cache_version
+
         with self._connect() as con:
-            row = con.execute(
-                """
-                SELECT id, name, description, created_at, updated_at, settings, is_default
-                FROM projects
-                WHERE id = ?
-                """,
-                [project_id]
-            ).fetchone()
+            row = self._exec(con, GET_PROJECT_SQL, [project_id]).fetchone()
             
             if not row:
                 return None
             
-            return {
+            project = {
                 "id": str(row[0]),
                 "name": row[1],
                 "description": row[2],
                 "created_at": row[3].isoformat() if row[3] else None,
                 "updated_at": row[4].isoformat() if row[4] else None,
-                "settings": json.loads(row[5]) if row[5] else {},
+                "settings": _loads_settings(row[5]),
                 "is_default": row[6],
             }
 
-    def list_projects(self) -> List[Dict[str, Any]]:
-        """List all projects with metadata."""
+        with self._cache_lock:
+            if self._cache_version == version:
+                self._project_cache[project_id] = copy.deepcopy(project)
+        return project
+
+    def list_projects(self, include_settings: bool = True) -> List[Dict[str, Any]]:
+        """List all projects with metadata.
+
+        With ``include_settings=False`` the settings documents are neither read
+        nor decoded and the ``settings`` key is omitted.
+        """
+        sql = LIST_PROJECTS_SQL if include_settings else LIST_PROJECT_SUMMARIES_SQL
         with self._connect() as con:
-            rows = con.execute(
-                """
-                SELECT 
-                    p.id, p.name, p.description, p.created_at, p.updated_at, 
-                    p.settings, p.is_default,
-                    COUNT(DISTINCT b.id) as board_count,
-                    COUNT(DISTINCT c.id) as conversation_count
-                FROM projects p
-                LEFT JOIN boards b ON b.project_id = p.id
-                LEFT JOIN agent_conversations c ON c.project_id = p.id
-                GROUP BY p.id, p.name, p.description, p.created_at, p.updated_at, p.settings, p.is_default
-                ORDER BY p.is_default DESC, p.updated_at DESC
-                """
-            ).fetchall()
-            
-            return [
-                {
-                    "id": str(row[0]),
-                    "name": row[1],
-                    "description": row[2],
-                    "created_at": row[3].isoformat() if row[3] else None,
-                    "updated_at": row[4].isoformat() if row[4] else None,
-                    "settings": json.loads(row[5]) if row[5] else {},
-                    "is_default": row[6],
-                    "board_count": row[7] or 0,
-                    "conversation_count": row[8] or 0,
-                }
-                for row in rows
-            ]
+            table = self._exec(con, sql, []).fetch_arrow_table()
+
+        # Build projects column-by-column instead of unpacking row tuples
+        columns = table.to_pydict()
+        created_at = [value.isoformat() if value else None for value in columns["created_at"]]
+        updated_at = [value.isoformat() if value else None for value in columns["updated_at"]]
+
+        projects = [
+            {
+                "id": project_id,
+                "name": name,
+                "description": description,
+                "created_at": project_created_at,
+                "updated_at": project_updated_at,
+                "is_default": is_default,
+                "board_count": board_count,
+                "conversation_count": conversation_count,
+            }
+            for (
+                project_id,
+                name,
+                description,
+                project_created_at,
+                project_updated_at,
+                is_default,
+                board_count,
+                conversation_count,
+            ) in zip(
+                columns["id"],
+                columns["name"],
+                columns["description"],
+                created_at,
+                updated_at,
+                columns["is_default"],
+                columns["board_count"],
+                columns["conversation_count"],
+            )
+        ]
+
+        if include_settings:
+            # Splice the settings documents into one array for a single parser call
+            settings = orjson.loads(
+                "[" + ",".join(value or "{}" for value in columns["settings"]) + "]"
+            )
+            for project, project_settings in zip(projects, settings):
+                project["settings"] = project_settings
+
+        return projects
 
     def create_project(self, name: str, description: Optional[str] = None) -> str:
         """Create a new project and return its ID."""
         project_id = self._generate_uuid()
-        now = datetime.now(UTC)
         
-        with self._connect() as con:
-            con.execute(
-                """
-                INSERT INTO projects (id, name, description, is_default, created_at, updated_at, settings)
-                VALUES (?, ?, ?, FALSE, ?, ?, ?)
-                """,
-                [
-                    project_id,
-                    name,
-                    description,
-                    now,
-                    now,
-                    json.dumps({}),
-                ]
-            )
+        with self._connect(write=True) as con:
+            self._exec(con, INSERT_PROJECT_SQL, [project_id, name, description])
         
         return project_id
 
     def update_project_settings(self, project_id: str, settings: Dict[str, Any]) -> None:
-        """Update project settings (merges with existing settings)."""
-        with self._connect() as con:
-            # Get existing settings
-            row = con.execute(
-                "SELECT settings FROM projects WHERE id = ?",
-                [project_id]
-            ).fetchone()
-            
+        """Update project settings (merges with existing settings).
+
+        The merge runs in Python rather than with ``json_merge_patch``, whose
+        RFC 7386 rules would delete keys set to null instead of storing null.
+        """
+        with self._transaction() as con:
+            row = self._exec(con, GET_SETTINGS_SQL, [project_id]).fetchone()
             if not row:
                 raise ValueError(f"Project {project_id} not found")
-            
-            existing_settings = json.loads(row[0]) if row[0] else {}
-            
+
+            existing_settings = _loads_settings(row[0])
+
             # Merge settings (deep merge for ui_state)
             if "ui_state" in settings and "ui_state" in existing_settings:
                 existing_settings["ui_state"].update(settings["ui_state"])
             else:
                 existing_settings.update(settings)
-            
-            # Update
-            now = datetime.now(UTC)
-            con.execute(
-                """
-                UPDATE projects 
-                SET settings = ?, updated_at = ?
-                WHERE id = ?
-                """,
-                [json.dumps(existing_settings), now, project_id]
+
+            self._exec(
+                con,
+                UPDATE_SETTINGS_SQL,
+                [orjson.dumps(existing_settings).decode(), project_id],
             )
+        self._invalidate_project(project_id)
 
     def delete_project(self, project_id: str) -> None:
         """Delete a project and all associated data (except default project)."""
-        with self._connect() as con:
-            # Check if it's the default project
-            row = con.execute(
-                "SELECT is_default FROM projects WHERE id = ?",
-                [project_id]
-            ).fetchone()
+        with self._transaction() as con:
+            # Delete associated data (cascade), children before parents
+            for statement in PROJECT_CASCADE_SQL:
+                self._exec(con, statement, [project_id])
             
-            if not row:
-                raise ValueError(f"Project {project_id} not found")
-            
-            if row[0]:
-                raise ValueError("Cannot delete the default project")
-            
-            # Delete associated data (cascade)
-            # Delete board items first
-            con.execute(
-                """
-                DELETE FROM board_items 
-                WHERE board_id IN (SELECT id FROM boards WHERE project_id = ?)
-                """,
-                [project_id]
-            )
-            
-            # Delete boards
-            con.execute("DELETE FROM boards WHERE project_id = ?", [project_id])
+            # Finally delete the project; the default project is guarded here
+            # and a refused delete rolls the cascade back
+            deleted = self._exec(con, DELETE_PROJECT_SQL, [project_id]).fetchone()
             
-            # Delete conversations and messages
-            con.execute(
-                """
-                DELETE FROM agent_messages 
-                WHERE conversation_id IN (SELECT id FROM agent_conversations WHERE project_id = ?)
-                """,
-                [project_id]
-            )
-            con.execute(
-                """
-                DELETE FROM agent_events 
-                WHERE conversation_id IN (SELECT id FROM agent_conversations WHERE project_id = ?)
-                """,
-                [project_id]
-            )
-            con.execute("DELETE FROM agent_conversations WHERE project_id = ?", [project_id])
-            
-            # Delete data sources
-            con.execute(
-                """
-                DELETE FROM data_source_tables 
-                WHERE data_source_id IN (SELECT id FROM data_sources WHERE project_id = ?)
-                """,
-                [project_id]
-            )
-            con.execute("DELETE FROM data_sources WHERE project_id = ?", [project_id])
-            
-            # Finally delete the project
-            con.execute("DELETE FROM projects WHERE id = ?", [project_id])
+            if not deleted:
+                row = self._exec(con, IS_DEFAULT_SQL, [project_id]).fetchone()
+                if row:
+                    raise ValueError("Cannot delete the default project")
+                raise ValueError(f"Project {project_id} not found")
+        self._invalidate_project(project_id)
+        # The cascade removed board rows behind the boards repository's back
+        clear_boards_caches(self.warehouse_path)
 
 
 @lru_cache(maxsize=1)
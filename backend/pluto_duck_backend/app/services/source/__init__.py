@@ -1,16 +1,9 @@
 """Source service - DuckDB ATTACH-based external database federation."""
 
-from .service import (
-    SourceService,
-    SourceType,
-    TableMode,
-    AttachedSource,
-    FolderSource,
-    FolderFile,
-    CachedTable,
-    SourceTable,
-    get_source_service,
-)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
 from .errors import (
     SourceError,
     AttachError,
@@ -19,6 +12,35 @@ from .errors import (
     TableNotFoundError,
 )
 
+if TYPE_CHECKING:
+    from .service import (
+        SourceService,
+        SourceType,
+        TableMode,
+        AttachedSource,
+        FolderSource,
+        FolderFile,
+        CachedTable,
+        SourceTable,
+        get_source_service,
+        reset_source_metadata,
+    )
+
+# Loaded on first access so importing the errors doesn't pull in DuckDB
+# and the app settings (PEP 562)
+_SERVICE_EXPORTS = {
+    "SourceService",
+    "SourceType",
+    "TableMode",
+    "AttachedSource",
+    "FolderSource",
+    "FolderFile",
+    "CachedTable",
+    "SourceTable",
+    "get_source_service",
+    "reset_source_metadata",
+}
+
 __all__ = [
     "SourceService",
     "SourceType",
@@ -29,6 +51,7 @@ __all__ = [
     "CachedTable",
     "SourceTable",
     "get_source_service",
+    "reset_source_metadata",
     "SourceError",
     "AttachError",
     "CacheError",
@@ -36,3 +59,12 @@ __all__ = [
     "TableNotFoundError",
 ]
 
+
+def __getattr__(name: str) -> Any:
+    if name in _SERVICE_EXPORTS:
+        from . import service
+
+        value = getattr(service, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
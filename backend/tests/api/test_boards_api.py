@@ -0,0 +1,50 @@
+import hashlib
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pluto_duck_backend.app.api.router import api_router
+from pluto_duck_backend.app.services.boards import BoardsRepository
+from pluto_duck_backend.app.services.boards.service import BoardsService
+from pluto_duck_backend.app.services.chat.repository import ChatRepository
+
+
+def create_app(warehouse: Path) -> tuple[FastAPI, BoardsRepository]:
+    ChatRepository(warehouse)
+    repo = BoardsRepository(warehouse)
+    service = BoardsService(repo)
+    service.warehouse_path = warehouse
+
+    app = FastAPI()
+    from pluto_duck_backend.app.api.v1.boards.router import get_repo, get_service
+
+    app.dependency_overrides[get_repo] = lambda: repo
+    app.dependency_overrides[get_service] = lambda: service
+    app.include_router(api_router)
+    return app, repo
+
+
+def test_download_asset_supports_conditional_get(tmp_path):
+    app, repo = create_app(tmp_path / "warehouse.duckdb")
+    client = TestClient(app)
+
+    content = b"\x89PNG-bytes"
+    digest = hashlib.sha256(content).hexdigest()
+    file_path = tmp_path / f"{digest}.png"
+    file_path.write_bytes(content)
+
+    board_id = repo.create_board("00000000-0000-0000-0000-000000000001", "Board")
+    item_id = repo.create_item(board_id, "image", {})
+    asset_id = repo.create_asset(item_id, "image", "a.png", str(file_path), mime_type="image/png")
+
+    response = client.get(f"/api/v1/boards/assets/{asset_id}/download")
+    assert response.status_code == 200
+    assert response.content == content
+    assert response.headers["etag"] == f'"{digest}"'
+
+    cached = client.get(
+        f"/api/v1/boards/assets/{asset_id}/download",
+        headers={"If-None-Match": f'"{digest}"'},
+    )
+    assert cached.status_code == 304
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pluto_duck_backend.app.api.router import api_router
+from pluto_duck_backend.app.services.chat.repository import ChatRepository
+from pluto_duck_backend.app.services.projects import ProjectRepository, get_project_repository
+
+
+def create_app(warehouse: Path) -> tuple[FastAPI, ProjectRepository]:
+    ChatRepository(warehouse)
+    repo = ProjectRepository(warehouse)
+
+    app = FastAPI()
+    app.dependency_overrides[get_project_repository] = lambda: repo
+    app.include_router(api_router)
+    return app, repo
+
+
+def test_list_and_get_projects(tmp_path):
+    app, repo = create_app(tmp_path / "warehouse.duckdb")
+    client = TestClient(app)
+
+    project_id = repo.create_project("Analysis", description="Quarterly numbers")
+    repo.update_project_settings(project_id, {"preferences": {"theme": "dark"}})
+
+    response = client.get("/api/v1/projects")
+    assert response.status_code == 200
+    projects = {project["id"]: project for project in response.json()}
+    assert projects[project_id]["name"] == "Analysis"
+    assert projects[project_id]["settings"] == {"preferences": {"theme": "dark"}}
+    assert projects[project_id]["board_count"] == 0
+
+    response = client.get(f"/api/v1/projects/{project_id}")
+    assert response.status_code == 200
+    assert response.json()["description"] == "Quarterly numbers"
+
+    assert client.get("/api/v1/projects/00000000-0000-0000-0000-00000000ffff").status_code == 404
+
+
+def test_list_projects_without_settings(tmp_path):
+    app, repo = create_app(tmp_path / "warehouse.duckdb")
+    client = TestClient(app)
+
+    project_id = repo.create_project("Analysis")
+    repo.update_project_settings(project_id, {"preferences": {"theme": "dark"}})
+
+    response = client.get("/api/v1/projects", params={"include_settings": "false"})
+    assert response.status_code == 200
+    projects = {project["id"]: project for project in response.json()}
+    assert "settings" not in projects[project_id]
+    assert projects[project_id]["name"] == "Analysis"
@@ -0,0 +1,372 @@
+"""Tests for the Boards repository."""
+
+from __future__ import annotations
+
+import io
+from pathlib import Path
+from uuid import UUID
+
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from pluto_duck_backend.app.services.boards import BoardsRepository
+from pluto_duck_backend.app.services.boards.service import BoardsService
+from pluto_duck_backend.app.services.chat.repository import ChatRepository
+
+
+@pytest.fixture
+def temp_warehouse(tmp_path: Path) -> Path:
+    """Create a temporary warehouse database with the board tables."""
+    warehouse = tmp_path / "warehouse.duckdb"
+    ChatRepository(warehouse)
+    return warehouse
+
+
+@pytest.fixture
+def repo(temp_warehouse: Path) -> BoardsRepository:
+    """Create a BoardsRepository on the temporary warehouse."""
+    return BoardsRepository(temp_warehouse)
+
+
+@pytest.fixture
+def service(repo: BoardsRepository, temp_warehouse: Path) -> BoardsService:
+    """Create a BoardsService that executes against the temporary warehouse."""
+    service = BoardsService(repo)
+    service.warehouse_path = temp_warehouse
+    return service
+
+
+@pytest.fixture
+def project_id() -> str:
+    """Project ID that owns the test boards."""
+    return "00000000-0000-0000-0000-000000000001"
+
+
+class TestBoardCRUD:
+    """Test board create/read/update/delete."""
+
+    def test_create_and_get_board(self, repo: BoardsRepository, project_id: str):
+        board_id = repo.create_board(project_id, "Sales", description="Q1", settings={"a": 1})
+
+        board = repo.get_board(board_id)
+        assert board is not None
+        assert board.id == board_id
+        assert board.project_id == project_id
+        assert board.name == "Sales"
+        assert board.description == "Q1"
+        assert board.settings == {"a": 1}
+        assert board.position == 0
+        assert board.created_at.tzinfo is not None
+
+    def test_ids_are_time_ordered(self, repo: BoardsRepository, project_id: str):
+        first = repo.create_board(project_id, "First")
+        second = repo.create_board(project_id, "Second")
+
+        assert UUID(first).version == 7
+        # The leading 48 bits hold the creation time in milliseconds
+        assert UUID(first).int >> 80 <= UUID(second).int >> 80
+
+    def test_get_missing_board(self, repo: BoardsRepository):
+        assert repo.get_board("00000000-0000-0000-0000-00000000ffff") is None
+
+    def test_create_board_appends_position(self, repo: BoardsRepository, project_id: str):
+        first = repo.create_board(project_id, "First")
+        second = repo.create_board(project_id, "Second")
+
+        assert repo.get_board(first).position == 0
+        assert repo.get_board(second).position == 1
+
+    def test_list_boards(self, repo: BoardsRepository, project_id: str):
+        first = repo.create_board(project_id, "First")
+        second = repo.create_board(project_id, "Second")
+        repo.create_item(first, "markdown", {"text": "hi"})
+
+        boards = repo.list_boards(project_id)
+
+        assert [b.id for b in boards] == [first, second]
+
+    def test_update_board(self, repo: BoardsRepository, project_id: str):
+        board_id = repo.create_board(project_id, "Old")
+
+        assert repo.update_board(board_id) is False
+        assert repo.update_board(board_id, name="New", settings={"b": 2}) is True
+
+        board = repo.get_board(board_id)
+        assert board.name == "New"
+        assert board.settings == {"b": 2}
+
+    def test_reorder_boards(self, repo: BoardsRepository, project_id: str):
+        first = repo.create_board(project_id, "First")
+        second = repo.create_board(project_id, "Second")
+
+        repo.reorder_boards(project_id, [(first, 1), (second, 0)])
+
+        assert repo.get_board(first).position == 1
+        assert repo.get_board(second).position == 0
+
+    def test_delete_board_cascades(self, repo: BoardsRepository, project_id: str):
+        board_id = repo.create_board(project_id, "Board")
+        item_id = repo.create_item(board_id, "chart", {"kind": "bar"})
+        query_id = repo.create_query(item_id, "SELECT 1")
+        asset_id = repo.create_asset(item_id, "image", "a.png", "/tmp/a.png")
+
+        assert repo.delete_board(board_id) is True
+
+        assert repo.get_board(board_id) is None
+        assert repo.get_item(item_id) is None
+        assert repo.get_query(query_id) is None
+        assert repo.get_asset(asset_id) is None
+        assert repo.delete_board(board_id) is False
+
+
+class TestBoardItemCRUD:
+    """Test board item operations."""
+
+    def test_create_and_list_items(self, repo: BoardsRepository, project_id: str):
+        board_id = repo.create_board(project_id, "Board")
+        lower = repo.create_item(board_id, "table", {"x": 1}, position_y=2)
+        upper = repo.create_item(
+            board_id, "chart", {"y": 2}, title="Chart", render_config={"color": "red"}
+        )
+
+        items = repo.list_items(board_id)
+
+        assert [i.id for i in items] == [upper, lower]
+        assert items[0].title == "Chart"
+        assert items[0].payload == {"y": 2}
+        assert items[0].render_config == {"color": "red"}
+        assert items[1].render_config is None
+
+    def test_bulk_create_items(self, repo: BoardsRepository, project_id: str):
+        board_id = repo.create_board(project_id, "Board")
+
+        item_ids = repo.bulk_create_items(
+            board_id,
+            [
+                {"item_type": "chart", "payload": {"n": 1}, "position_y": 1},
+                {"item_type": "table", "payload": {"n": 2}, "render_config": {"c": 1}},
+            ],
+        )
+
+        items = repo.list_items(board_id)
+        assert [i.id for i in items] == [item_ids[1], item_ids[0]]
+        assert items[0].render_config == {"c": 1}
+        assert items[1].payload == {"n": 1}
+        assert repo.bulk_create_items(board_id, []) == []
+
+    def test_list_items_reflects_changes(self, repo: BoardsRepository, project_id: str):
+        board_id = repo.create_board(project_id, "Board")
+        item_id = repo.create_item(board_id, "chart", {"v": 1})
+        other_id = repo.create_item(board_id, "chart", {"v": 2}, position_y=1)
+
+        assert repo.list_items(board_id)[0].payload == {"v": 1}
+        assert repo.list_items(board_id)[0].payload == {"v": 1}
+
+        repo.update_item(item_id, payload={"v": 3})
+        assert repo.list_items(board_id)[0].payload == {"v": 3}
+
+        repo.delete_item(other_id)
+        assert [i.id for i in repo.list_items(board_id)] == [item_id]
+
+        repo.update_item_position(item_id, 0, 5, 1, 1)
+        assert repo.list_items(board_id)[0].position_y == 5
+
+    def test_list_items_returns_copies(self, repo: BoardsRepository, project_id: str):
+        board_id = repo.create_board(project_id, "Board")
+        repo.create_item(board_id, "chart", {"v": 1})
+
+        items = repo.list_items(board_id)
+        items[0].payload["v"] = 2
+        items[0].title = "changed"
+
+        cached = repo.list_items(board_id)
+        assert cached[0].payload == {"v": 1}
+        assert cached[0].title is None
+
+    def test_update_item(self, repo: BoardsRepository, project_id: str):
+        board_id = repo.create_board(project_id, "Board")
+        item_id = repo.create_item(board_id, "chart", {"kind": "bar"})
+
+        assert repo.update_item(item_id) is False
+        assert repo.update_item(item_id, title="T", payload={"kind": "line"}) is True
+
+        item = repo.get_item(item_id)
+        assert item.title == "T"
+        assert item.payload == {"kind": "line"}
+
+    def test_update_item_position(self, repo: BoardsRepository, project_id: str):
+        board_id = repo.create_board(project_id, "Board")
+        item_id = repo.create_item(board_id, "chart", {})
+
+        repo.update_item_position(item_id, 3, 4, 5, 6)
+
+        item = repo.get_item(item_id)
+        assert (item.position_x, item.position_y, item.width, item.height) == (3, 4, 5, 6)
+
+    def test_delete_item_cascades(self, repo: BoardsRepository, project_id: str):
+        board_id = repo.create_board(project_id, "Board")
+        item_id = repo.create_item(board_id, "chart", {})
+        query_id = repo.create_query(item_id, "SELECT 1")
+
+        assert repo.delete_item(item_id) is True
+
+        assert repo.get_item(item_id) is None
+        assert repo.get_query(query_id) is None
+        assert repo.delete_item(item_id) is False
+
+
+class TestBoardQueryCRUD:
+    """Test board query operations."""
+
+    def test_query_lifecycle(self, repo: BoardsRepository, project_id: str):
+        board_id = repo.create_board(project_id, "Board")
+        item_id = repo.create_item(board_id, "chart", {})
+        query_id = repo.create_query(item_id, "SELECT 1", data_source_tables=["t"])
+
+        query = repo.get_query_by_item(item_id)
+        assert query.id == query_id
+        assert query.data_source_tables == ["t"]
+        assert query.execution_status == "pending"
+        assert query.last_result_snapshot is None
+
+        assert repo.update_query(query_id, query_text="SELECT 2") is True
+        repo.update_query_result(query_id, {"columns": ["a"], "data": [{"a": 1}]}, 1, "success")
+        missing = "00000000-0000-0000-0000-00000000ffff"
+        assert repo.update_query_result(missing, {"columns": []}, 0, "success") is False
+
+        query = repo.get_query(query_id)
+        assert query.query_text == "SELECT 2"
+        assert query.execution_status == "success"
+        assert query.last_result_rows == 1
+        assert query.last_result_snapshot == {"columns": ["a"], "data": [{"a": 1}]}
+        assert query.last_executed_at is not None
+
+
+    def test_cached_snapshot(self, repo: BoardsRepository, project_id: str):
+        board_id = repo.create_board(project_id, "Board")
+        item_id = repo.create_item(board_id, "chart", {})
+        query_id = repo.create_query(item_id, "SELECT 1")
+
+        assert repo.get_cached_snapshot(query_id) is None
+
+        repo.update_query_result(query_id, {"columns": ["a"], "data": [{"a": 1}]}, 1, "success")
+        assert repo.get_cached_snapshot(query_id) == {"columns": ["a"], "data": [{"a": 1}]}
+
+        repo.update_query_result(query_id, None, 0, "error", error_message="boom")
+        assert repo.get_cached_snapshot(query_id) is None
+
+        repo.update_query_result(query_id, {"columns": ["b"], "data": []}, 0, "success")
+        repo.delete_item(item_id)
+        assert repo.get_cached_snapshot(query_id) is None
+
+    def test_owner_lookups(self, repo: BoardsRepository, project_id: str):
+        board_id = repo.create_board(project_id, "Board")
+        item_id = repo.create_item(board_id, "chart", {})
+        query_id = repo.create_query(item_id, "SELECT 1")
+
+        query, owner_board_id, owner_project_id = repo.get_query_with_owner(query_id)
+        assert query.id == query_id
+        assert (owner_board_id, owner_project_id) == (board_id, project_id)
+        assert repo.get_item_owner(item_id) == (board_id, project_id)
+        assert repo.get_query_with_owner("00000000-0000-0000-0000-00000000ffff") is None
+        assert repo.get_item_owner("00000000-0000-0000-0000-00000000ffff") is None
+
+
+class TestBoardAssetCRUD:
+    """Test board asset operations."""
+
+    def test_asset_lifecycle(self, repo: BoardsRepository, project_id: str):
+        board_id = repo.create_board(project_id, "Board")
+        item_id = repo.create_item(board_id, "image", {})
+        asset_id = repo.create_asset(
+            item_id, "image", "a.png", "/tmp/a.png", file_size=10, mime_type="image/png"
+        )
+
+        asset = repo.get_asset(asset_id)
+        assert asset.board_item_id == item_id
+        assert asset.file_size == 10
+        assert [a.id for a in repo.list_assets(item_id)] == [asset_id]
+
+        assert repo.delete_asset(asset_id) is True
+        assert repo.get_asset(asset_id) is None
+        assert repo.delete_asset(asset_id) is False
+
+
+class TestBoardsServiceQuery:
+    """Test query execution through the service."""
+
+    @pytest.mark.asyncio
+    async def test_execute_query_caches_snapshot(
+        self, service: BoardsService, repo: BoardsRepository, project_id: str
+    ):
+        board_id = repo.create_board(project_id, "Board")
+        item_id = repo.create_item(board_id, "table", {})
+        query_id = repo.create_query(item_id, "SELECT range AS n, 'x' AS s FROM range(3)")
+
+        snapshot = await service.execute_query(query_id, project_id)
+
+        assert snapshot["columns"] == ["n", "s"]
+        assert snapshot["data"] == [{"n": 0, "s": "x"}, {"n": 1, "s": "x"}, {"n": 2, "s": "x"}]
+        assert snapshot["row_count"] == 3
+        assert await service.get_cached_result(query_id) == snapshot
+
+        stored = repo.get_query(query_id).last_result_snapshot
+        assert stored["columns_data"] == [[0, 1, 2], ["x", "x", "x"]]
+        assert "data" not in stored
+
+    @pytest.mark.asyncio
+    async def test_execute_query_limits_rows(
+        self, service: BoardsService, repo: BoardsRepository, project_id: str
+    ):
+        board_id = repo.create_board(project_id, "Board")
+        item_id = repo.create_item(board_id, "table", {})
+        query_id = repo.create_query(item_id, "SELECT range AS n FROM range(5)")
+
+        snapshot = await service.execute_query(query_id, project_id, limit=2)
+        cached = await service.get_cached_result(query_id, limit=3)
+
+        assert snapshot["data"] == [{"n": 0}, {"n": 1}]
+        assert snapshot["row_count"] == 5
+        assert cached["data"] == [{"n": 0}, {"n": 1}, {"n": 2}]
+        assert cached["row_count"] == 5
+
+    @pytest.mark.asyncio
+    async def test_execute_query_checks_project(
+        self, service: BoardsService, repo: BoardsRepository, project_id: str
+    ):
+        board_id = repo.create_board(project_id, "Board")
+        item_id = repo.create_item(board_id, "table", {})
+        query_id = repo.create_query(item_id, "SELECT 1")
+
+        with pytest.raises(PermissionError):
+            await service.execute_query(query_id, "00000000-0000-0000-0000-000000000002")
+
+
+class TestBoardsServiceAssets:
+    """Test asset uploads through the service."""
+
+    @pytest.mark.asyncio
+    async def test_upload_asset_streams_and_dedupes(
+        self, service: BoardsService, repo: BoardsRepository, project_id: str, tmp_path: Path
+    ):
+        service.asset_storage_path = tmp_path / "assets"
+        board_id = repo.create_board(project_id, "Board")
+        item_id = repo.create_item(board_id, "image", {})
+        content = b"\x89PNG" + b"x" * 5000
+
+        def upload() -> UploadFile:
+            return UploadFile(
+                io.BytesIO(content),
+                filename="chart.png",
+                headers=Headers({"content-type": "image/png"}),
+            )
+
+        first = await service.upload_asset(item_id, upload(), project_id)
+        second = await service.upload_asset(item_id, upload(), project_id)
+
+        assert first["file_size"] == len(content)
+        first_path = Path(repo.get_asset(first["asset_id"]).file_path)
+        assert first_path == Path(repo.get_asset(second["asset_id"]).file_path)
+        assert first_path.read_bytes() == content
+        assert [p.name for p in service.asset_storage_path.iterdir()] == [first_path.name]
@@ -0,0 +1,85 @@
+"""Tests for the pooled warehouse connections."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from pluto_duck_backend.app.services.duckdb_utils import (
+    close_warehouse_pools,
+    connect_warehouse,
+)
+
+
+@pytest.fixture
+def warehouse(tmp_path: Path):
+    """Warehouse path whose pool is closed after the test."""
+    yield tmp_path / "warehouse.duckdb"
+    close_warehouse_pools()
+
+
+def test_writes_are_visible_to_other_cursors(warehouse: Path):
+    with connect_warehouse(warehouse) as con:
+        con.execute("CREATE TABLE t (v INTEGER)")
+        con.execute("INSERT INTO t VALUES (1)")
+
+    with connect_warehouse(warehouse) as con:
+        assert con.execute("SELECT v FROM t").fetchall() == [(1,)]
+
+
+def test_nested_use_does_not_block(warehouse: Path):
+    with connect_warehouse(warehouse) as outer:
+        with connect_warehouse(warehouse) as inner:
+            assert inner is not outer
+            assert inner.execute("SELECT 1").fetchone() == (1,)
+
+
+def test_failed_transaction_is_rolled_back(warehouse: Path):
+    with connect_warehouse(warehouse) as con:
+        con.execute("CREATE TABLE t (v INTEGER)")
+
+    with pytest.raises(duckdb.Error):
+        with connect_warehouse(warehouse) as con:
+            con.execute("BEGIN TRANSACTION")
+            con.execute("INSERT INTO t VALUES (1)")
+            con.execute("SELECT missing FROM t")
+
+    with connect_warehouse(warehouse) as con:
+        assert con.execute("SELECT COUNT(*) FROM t").fetchone() == (0,)
+
+
+def test_concurrent_writers_take_turns(warehouse: Path):
+    with connect_warehouse(warehouse) as con:
+        con.execute("CREATE TABLE counter (v INTEGER)")
+        con.execute("INSERT INTO counter VALUES (0)")
+
+    def increment(_: int) -> None:
+        # Read-modify-write transactions on one row conflict unless serialized
+        with connect_warehouse(warehouse, write=True) as con:
+            con.execute("BEGIN TRANSACTION")
+            (value,) = con.execute("SELECT v FROM counter").fetchone()
+            con.execute("UPDATE counter SET v = ?", [value + 1])
+            con.execute("COMMIT")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(increment, range(40)))
+
+    with connect_warehouse(warehouse) as con:
+        assert con.execute("SELECT v FROM counter").fetchone() == (40,)
+
+
+def test_memory_warehouse_is_shared_and_not_written_to_disk(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    try:
+        with connect_warehouse(Path(":memory:")) as con:
+            con.execute("CREATE TABLE t (v INTEGER)")
+            con.execute("INSERT INTO t VALUES (1)")
+
+        with connect_warehouse(Path(":memory:")) as con:
+            assert con.execute("SELECT v FROM t").fetchall() == [(1,)]
+        assert list(tmp_path.iterdir()) == []
+    finally:
+        close_warehouse_pools()
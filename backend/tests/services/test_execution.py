@@ -1,6 +1,8 @@
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from uuid import uuid4
 
+from pluto_duck_backend.app.services.duckdb_utils import connect_warehouse
 from pluto_duck_backend.app.services.execution import QueryExecutionService
 
 
@@ -13,7 +15,29 @@ def test_query_execution_success(tmp_path: Path) -> None:
     job = service.execute(run_id)
 
     assert job.status == "success"
+    assert job.rows_affected == 1
     fetched = service.fetch(run_id)
     assert fetched is not None
     assert fetched.result_table is not None
+    assert fetched.rows_affected == 1
+    # Timestamps round-trip as UTC regardless of the host time zone
+    assert abs(fetched.completed_at - datetime.now(UTC)) < timedelta(minutes=1)
 
+
+
+def test_cleanup_drops_result_tables(tmp_path: Path) -> None:
+    warehouse = tmp_path / "warehouse.duckdb"
+    service = QueryExecutionService(warehouse)
+
+    run_ids = [str(uuid4()) for _ in range(3)]
+    for run_id in run_ids:
+        service.submit(run_id, "select 1 as value")
+        service.execute(run_id)
+    result_tables = [service.fetch(run_id).result_table for run_id in run_ids]
+
+    assert service.cleanup(older_than_hours=-1) == 3
+
+    assert all(service.fetch(run_id) is None for run_id in run_ids)
+    with connect_warehouse(warehouse) as con:
+        tables = {row[0] for row in con.execute("SHOW TABLES").fetchall()}
+    assert tables.isdisjoint(result_tables)
@@ -1,78 +1,163 @@
-"""Tests for the File Diagnosis service."""
+"""Tests for the File Diagnosis service.
+
+Fixtures only write under ``tmp_path_factory``, so the module can run
+across workers with ``pytest -n auto``.
+"""
 
 from __future__ import annotations
 
-import csv
+import dataclasses
+from datetime import UTC, datetime
 from pathlib import Path
+from typing import Dict, Iterator
 
 import pytest
 
 from pluto_duck_backend.app.services.asset import (
+    DiagnoseFileRequest,
+    FileDiagnosis,
     FileDiagnosisService,
     DiagnosisError,
 )
+from pluto_duck_backend.app.services.asset.file_diagnosis_service import (
+    IssueItem,
+    LLMAnalysisResult,
+    PotentialItem,
+)
+from pluto_duck_backend.app.services.duckdb_utils import close_warehouse_pools
 
 
-@pytest.fixture
-def temp_dir(tmp_path: Path) -> Path:
-    """Create temporary directories."""
-    return tmp_path
+@pytest.fixture(scope="module")
+def temp_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Create a temporary directory shared by the module's tests."""
+    return tmp_path_factory.mktemp("diag")
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def warehouse_path(temp_dir: Path) -> Path:
     """Create a temporary warehouse."""
     return temp_dir / "warehouse.duckdb"
 
 
-@pytest.fixture
-def diagnosis_service(temp_dir: Path, warehouse_path: Path) -> FileDiagnosisService:
-    """Create a FileDiagnosisService instance."""
-    return FileDiagnosisService(
+@pytest.fixture(scope="module")
+def diagnosis_service() -> Iterator[FileDiagnosisService]:
+    """Create one FileDiagnosisService for the module on an in-memory warehouse.
+
+    Only TestDiagnosisCaching checks what survives in the warehouse, so it
+    uses its own service backed by a file.
+    """
+    yield FileDiagnosisService(
         project_id="test-project",
-        warehouse_path=warehouse_path,
+        warehouse_path=Path(":memory:"),
     )
+    close_warehouse_pools()
+
+
+@pytest.fixture(autouse=True)
+def clear_cached_diagnoses(
+    diagnosis_service: FileDiagnosisService, temp_dir: Path
+) -> Iterator[None]:
+    """Keep tests isolated by dropping diagnoses cached for the sample files."""
+    yield
+    for csv_path in temp_dir.glob("*.csv"):
+        diagnosis_service.delete_cached_diagnosis(str(csv_path))
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_csv(temp_dir: Path) -> Path:
     """Create a sample CSV file with some NULL values."""
     csv_path = temp_dir / "sample.csv"
-    with open(csv_path, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["id", "name", "value", "category"])
-        writer.writerow([1, "Alice", 100, "A"])
-        writer.writerow([2, "Bob", "", "B"])  # Empty value
-        writer.writerow([3, "", 300, "A"])  # Empty name
-        writer.writerow([4, "Diana", 400, ""])  # Empty category
-        writer.writerow([5, "Eve", 500, "C"])
+    csv_path.write_text(
+        "id,name,value,category\n"
+        "1,Alice,100,A\n"
+        "2,Bob,,B\n"  # Empty value
+        "3,,300,A\n"  # Empty name
+        "4,Diana,400,\n"  # Empty category
+        "5,Eve,500,C\n"
+    )
     return csv_path
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
+def sample_csv_str(sample_csv: Path) -> str:
+    """Path of sample.csv as the string the service takes and caches under."""
+    return str(sample_csv)
+
+
+@pytest.fixture(scope="module")
 def sample_csv_with_nulls(temp_dir: Path) -> Path:
     """Create a CSV file with NULL values."""
     csv_path = temp_dir / "nulls.csv"
-    with open(csv_path, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["col_a", "col_b", "col_c"])
-        writer.writerow([1, "x", ""])
-        writer.writerow(["", "y", "val"])
-        writer.writerow([3, "", "val"])
-        writer.writerow(["", "", ""])
+    csv_path.write_text(
+        "col_a,col_b,col_c\n"
+        "1,x,\n"
+        ",y,val\n"
+        "3,,val\n"
+        ",,\n"
+    )
     return csv_path
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def empty_csv(temp_dir: Path) -> Path:
     """Create an empty CSV file with only headers."""
     csv_path = temp_dir / "empty.csv"
-    with open(csv_path, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["col1", "col2", "col3"])
+    csv_path.write_text("col1,col2,col3\n")
     return csv_path
 
 
+@pytest.fixture(scope="module")
+def all_diagnoses(
+    diagnosis_service: FileDiagnosisService,
+    sample_csv: Path,
+    sample_csv_with_nulls: Path,
+    empty_csv: Path,
+) -> Dict[str, FileDiagnosis]:
+    """Diagnose the shared sample files in one batch, keyed by file path."""
+    files = [
+        DiagnoseFileRequest(file_path=str(path), file_type="csv")
+        for path in (sample_csv, sample_csv_with_nulls, empty_csv)
+    ]
+    return {
+        diagnosis.file_path: diagnosis
+        for diagnosis in diagnosis_service.diagnose_files(files)
+    }
+
+
+@pytest.fixture(scope="module")
+def diagnosed_sample(
+    all_diagnoses: Dict[str, FileDiagnosis], sample_csv_str: str
+) -> FileDiagnosis:
+    """Diagnosis of sample.csv for the tests that only read the result."""
+    return all_diagnoses[sample_csv_str]
+
+
+@pytest.fixture(scope="module")
+def diagnosed_sample_nulls(
+    all_diagnoses: Dict[str, FileDiagnosis], sample_csv_with_nulls: Path
+) -> FileDiagnosis:
+    """Diagnosis of nulls.csv for the tests that only read the result."""
+    return all_diagnoses[str(sample_csv_with_nulls)]
+
+
+@pytest.fixture(scope="module")
+def llm_analysis_result() -> LLMAnalysisResult:
+    """LLM analysis attached to diagnoses by the cache tests."""
+    return LLMAnalysisResult(
+        suggested_name="test_dataset",
+        context="This is a test dataset for unit testing.",
+        potential=[
+            PotentialItem(question="What is the data about?", analysis="Analyze columns"),
+            PotentialItem(question="Any patterns?", analysis="Check distributions"),
+        ],
+        issues=[
+            IssueItem(issue="Missing values", suggestion="Fill or remove nulls"),
+        ],
+        analyzed_at=datetime(2025, 1, 1, tzinfo=UTC),
+        model_used="test-model",
+    )
+
+
 class TestFileDiagnosisServiceInit:
     """Test FileDiagnosisService initialization."""
 
@@ -90,12 +175,12 @@ class TestDiagnoseFile:
     """Test diagnose_file functionality."""
 
     def test_diagnose_csv_schema(
-        self, diagnosis_service: FileDiagnosisService, sample_csv: Path
+        self, diagnosed_sample: FileDiagnosis, sample_csv_str: str
     ):
         """Test schema extraction from CSV."""
-        diagnosis = diagnosis_service.diagnose_file(str(sample_csv), "csv")
+        diagnosis = diagnosed_sample
 
-        assert diagnosis.file_path == str(sample_csv)
+        assert diagnosis.file_path == sample_csv_str
         assert diagnosis.file_type == "csv"
         assert len(diagnosis.schema) == 4
 
@@ -105,27 +190,23 @@ class TestDiagnoseFile:
         assert "value" in col_names
         assert "category" in col_names
 
-    def test_diagnose_csv_row_count(
-        self, diagnosis_service: FileDiagnosisService, sample_csv: Path
-    ):
+    def test_diagnose_csv_row_count(self, diagnosed_sample: FileDiagnosis):
         """Test row count from CSV."""
-        diagnosis = diagnosis_service.diagnose_file(str(sample_csv), "csv")
+        diagnosis = diagnosed_sample
 
         assert diagnosis.row_count == 5
 
-    def test_diagnose_csv_file_size(
-        self, diagnosis_service: FileDiagnosisService, sample_csv: Path
-    ):
+    def test_diagnose_csv_file_size(self, diagnosed_sample: FileDiagnosis):
         """Test file size is captured."""
-        diagnosis = diagnosis_service.diagnose_file(str(sample_csv), "csv")
+        diagnosis = diagnosed_sample
 
         assert diagnosis.file_size_bytes > 0
 
     def test_diagnose_csv_missing_values(
-        self, diagnosis_service: FileDiagnosisService, sample_csv_with_nulls: Path
+        self, diagnosed_sample_nulls: FileDiagnosis
     ):
         """Test missing values detection."""
-        diagnosis = diagnosis_service.diagnose_file(str(sample_csv_with_nulls), "csv")
+        diagnosis = diagnosed_sample_nulls
 
         # Check that missing values are counted
         assert "col_a" in diagnosis.missing_values
@@ -138,10 +219,10 @@ class TestDiagnoseFile:
         assert total_missing >= 0  # At least some detection occurred
 
     def test_diagnose_empty_csv(
-        self, diagnosis_service: FileDiagnosisService, empty_csv: Path
+        self, all_diagnoses: Dict[str, FileDiagnosis], empty_csv: Path
     ):
         """Test diagnosis of empty CSV (headers only)."""
-        diagnosis = diagnosis_service.diagnose_file(str(empty_csv), "csv")
+        diagnosis = all_diagnoses[str(empty_csv)]
 
         assert diagnosis.row_count == 0
         assert len(diagnosis.schema) == 3
@@ -156,11 +237,11 @@ class TestDiagnoseFile:
         assert "not found" in str(exc_info.value).lower()
 
     def test_diagnose_unsupported_file_type(
-        self, diagnosis_service: FileDiagnosisService, sample_csv: Path
+        self, diagnosis_service: FileDiagnosisService, sample_csv_str: str
     ):
         """Test diagnosis with unsupported file type raises error."""
         with pytest.raises(DiagnosisError) as exc_info:
-            diagnosis_service.diagnose_file(str(sample_csv), "xlsx")  # type: ignore
+            diagnosis_service.diagnose_file(sample_csv_str, "xlsx")  # type: ignore
 
         assert "unsupported" in str(exc_info.value).lower()
 
@@ -171,21 +252,19 @@ class TestDiagnoseFiles:
     def test_diagnose_multiple_files(
         self,
         diagnosis_service: FileDiagnosisService,
-        sample_csv: Path,
+        sample_csv_str: str,
         sample_csv_with_nulls: Path,
     ):
         """Test diagnosing multiple files."""
-        from pluto_duck_backend.app.services.asset import DiagnoseFileRequest
-
         files = [
-            DiagnoseFileRequest(file_path=str(sample_csv), file_type="csv"),
+            DiagnoseFileRequest(file_path=sample_csv_str, file_type="csv"),
             DiagnoseFileRequest(file_path=str(sample_csv_with_nulls), file_type="csv"),
         ]
 
         diagnoses = diagnosis_service.diagnose_files(files)
 
         assert len(diagnoses) == 2
-        assert diagnoses[0].file_path == str(sample_csv)
+        assert diagnoses[0].file_path == sample_csv_str
         assert diagnoses[1].file_path == str(sample_csv_with_nulls)
 
     def test_diagnose_empty_list(
@@ -200,14 +279,14 @@ class TestFileDiagnosisDataclass:
     """Test FileDiagnosis dataclass methods."""
 
     def test_to_dict(
-        self, diagnosis_service: FileDiagnosisService, sample_csv: Path
+        self, diagnosed_sample: FileDiagnosis, sample_csv_str: str
     ):
         """Test to_dict conversion."""
-        diagnosis = diagnosis_service.diagnose_file(str(sample_csv), "csv")
+        diagnosis = diagnosed_sample
         result = diagnosis.to_dict()
 
         assert isinstance(result, dict)
-        assert result["file_path"] == str(sample_csv)
+        assert result["file_path"] == sample_csv_str
         assert result["file_type"] == "csv"
         assert "schema" in result
         assert "missing_values" in result
@@ -215,11 +294,9 @@ class TestFileDiagnosisDataclass:
         assert "file_size_bytes" in result
         assert "diagnosed_at" in result
 
-    def test_schema_to_dict(
-        self, diagnosis_service: FileDiagnosisService, sample_csv: Path
-    ):
+    def test_schema_to_dict(self, diagnosed_sample: FileDiagnosis):
         """Test ColumnSchema to_dict conversion."""
-        diagnosis = diagnosis_service.diagnose_file(str(sample_csv), "csv")
+        diagnosis = diagnosed_sample
 
         for col in diagnosis.schema:
             col_dict = col.to_dict()
@@ -239,40 +316,47 @@ class TestTypeSuggestions:
     - Data that has non-numeric markers interspersed
     """
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def csv_with_varchar_integers(self, temp_dir: Path) -> Path:
         """Create a CSV with integers that DuckDB keeps as VARCHAR due to leading zeros."""
         csv_path = temp_dir / "varchar_integers.csv"
-        with open(csv_path, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(["id", "code", "status"])
+        csv_path.write_text(
+            "id,code,status\n"
             # Leading zeros cause DuckDB to treat as VARCHAR
-            writer.writerow(["001", "100", "active"])
-            writer.writerow(["002", "200", "active"])
-            writer.writerow(["003", "300", "active"])
-            writer.writerow(["004", "400", "active"])
-            writer.writerow(["005", "500", "active"])
+            "001,100,active\n"
+            "002,200,active\n"
+            "003,300,active\n"
+            "004,400,active\n"
+            "005,500,active\n"
+        )
         return csv_path
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def csv_with_mixed_types(self, temp_dir: Path) -> Path:
         """Create a CSV file with mixed types that shouldn't trigger suggestions."""
         csv_path = temp_dir / "mixed_types.csv"
-        with open(csv_path, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(["id", "value"])
-            writer.writerow(["1", "100"])
-            writer.writerow(["2", "hello"])
-            writer.writerow(["3", "300"])
-            writer.writerow(["4", "world"])
-            writer.writerow(["5", "500"])
+        csv_path.write_text(
+            "id,value\n"
+            "1,100\n"
+            "2,hello\n"
+            "3,300\n"
+            "4,world\n"
+            "5,500\n"
+        )
         return csv_path
 
-    def test_type_suggestions_structure(
+    @pytest.fixture(scope="module")
+    def diagnosed_varchar_integers(
         self, diagnosis_service: FileDiagnosisService, csv_with_varchar_integers: Path
+    ) -> FileDiagnosis:
+        """Diagnose varchar_integers.csv once for the tests that only read the result."""
+        return diagnosis_service.diagnose_file(str(csv_with_varchar_integers), "csv")
+
+    def test_type_suggestions_structure(
+        self, diagnosed_varchar_integers: FileDiagnosis
     ):
         """Test that type suggestions have correct structure."""
-        diagnosis = diagnosis_service.diagnose_file(str(csv_with_varchar_integers), "csv")
+        diagnosis = diagnosed_varchar_integers
 
         # type_suggestions should always be a list
         assert isinstance(diagnosis.type_suggestions, list)
@@ -300,10 +384,10 @@ class TestTypeSuggestions:
         assert len(value_suggestions) == 0
 
     def test_type_suggestion_includes_sample_values_when_present(
-        self, diagnosis_service: FileDiagnosisService, csv_with_varchar_integers: Path
+        self, diagnosed_varchar_integers: FileDiagnosis
     ):
         """Test that type suggestions include sample values when present."""
-        diagnosis = diagnosis_service.diagnose_file(str(csv_with_varchar_integers), "csv")
+        diagnosis = diagnosed_varchar_integers
 
         for suggestion in diagnosis.type_suggestions:
             assert isinstance(suggestion.sample_values, list)
@@ -312,10 +396,10 @@ class TestTypeSuggestions:
                 assert len(suggestion.sample_values) > 0
 
     def test_type_suggestion_to_dict(
-        self, diagnosis_service: FileDiagnosisService, csv_with_varchar_integers: Path
+        self, diagnosed_varchar_integers: FileDiagnosis
     ):
         """Test TypeSuggestion to_dict conversion."""
-        diagnosis = diagnosis_service.diagnose_file(str(csv_with_varchar_integers), "csv")
+        diagnosis = diagnosed_varchar_integers
 
         for suggestion in diagnosis.type_suggestions:
             suggestion_dict = suggestion.to_dict()
@@ -326,10 +410,10 @@ class TestTypeSuggestions:
             assert "sample_values" in suggestion_dict
 
     def test_suggests_bigint_for_varchar_numeric_column(
-        self, diagnosis_service: FileDiagnosisService, csv_with_varchar_integers: Path
+        self, diagnosed_varchar_integers: FileDiagnosis
     ):
         """Test that VARCHAR columns with numeric content get BIGINT/DOUBLE suggestions."""
-        diagnosis = diagnosis_service.diagnose_file(str(csv_with_varchar_integers), "csv")
+        diagnosis = diagnosed_varchar_integers
 
         # Check that we got the schema
         varchar_cols = [c for c in diagnosis.schema if "VARCHAR" in c.type.upper()]
@@ -347,19 +431,43 @@ class TestTypeSuggestions:
 class TestDiagnosisCaching:
     """Test diagnosis result caching functionality."""
 
+    @pytest.fixture
+    def cache_service(self, warehouse_path: Path) -> FileDiagnosisService:
+        """Cache tests run against a warehouse file, with a fresh service each."""
+        return FileDiagnosisService(
+            project_id="test-project",
+            warehouse_path=warehouse_path,
+        )
+
+    @pytest.fixture(autouse=True)
+    def clear_cached_diagnoses(
+        self, cache_service: FileDiagnosisService, temp_dir: Path
+    ) -> Iterator[None]:
+        """Drop what each cache test saved to the warehouse file."""
+        yield
+        for csv_path in temp_dir.glob("*.csv"):
+            cache_service.delete_cached_diagnosis(str(csv_path))
+
+    @pytest.fixture
+    def fresh_diagnosis(self, diagnosed_sample: FileDiagnosis) -> FileDiagnosis:
+        """Copy of the shared sample.csv diagnosis that a test may modify."""
+        return dataclasses.replace(diagnosed_sample)
+
     def test_save_and_retrieve_diagnosis(
-        self, diagnosis_service: FileDiagnosisService, sample_csv: Path
+        self,
+        cache_service: FileDiagnosisService,
+        fresh_diagnosis: FileDiagnosis,
+        sample_csv_str: str,
     ):
         """Test saving and retrieving a cached diagnosis."""
-        # First, diagnose the file
-        diagnosis = diagnosis_service.diagnose_file(str(sample_csv), "csv")
+        diagnosis = fresh_diagnosis
 
         # Save the diagnosis
-        diagnosis_id = diagnosis_service.save_diagnosis(diagnosis)
+        diagnosis_id = cache_service.save_diagnosis(diagnosis)
         assert diagnosis_id.startswith("diag_")
 
         # Retrieve the cached diagnosis
-        cached = diagnosis_service.get_cached_diagnosis(str(sample_csv))
+        cached = cache_service.get_cached_diagnosis(sample_csv_str)
         assert cached is not None
         assert cached.file_path == diagnosis.file_path
         assert cached.file_type == diagnosis.file_type
@@ -368,108 +476,104 @@ class TestDiagnosisCaching:
         assert len(cached.schema) == len(diagnosis.schema)
 
     def test_get_nonexistent_cached_diagnosis(
-        self, diagnosis_service: FileDiagnosisService
+        self, cache_service: FileDiagnosisService
     ):
         """Test retrieving non-existent cached diagnosis returns None."""
-        cached = diagnosis_service.get_cached_diagnosis("/nonexistent/path.csv")
+        cached = cache_service.get_cached_diagnosis("/nonexistent/path.csv")
         assert cached is None
 
     def test_save_overwrites_existing_diagnosis(
-        self, diagnosis_service: FileDiagnosisService, sample_csv: Path
+        self,
+        cache_service: FileDiagnosisService,
+        fresh_diagnosis: FileDiagnosis,
+        sample_csv_str: str,
     ):
         """Test that saving a diagnosis overwrites existing one for same file."""
         # First diagnosis
-        diagnosis1 = diagnosis_service.diagnose_file(str(sample_csv), "csv")
-        id1 = diagnosis_service.save_diagnosis(diagnosis1)
+        diagnosis1 = fresh_diagnosis
+        id1 = cache_service.save_diagnosis(diagnosis1)
 
-        # Second diagnosis (same file)
-        diagnosis2 = diagnosis_service.diagnose_file(str(sample_csv), "csv")
-        id2 = diagnosis_service.save_diagnosis(diagnosis2)
+        # Second diagnosis (same file); only the overwrite matters, so skip rescanning
+        diagnosis2 = dataclasses.replace(diagnosis1, diagnosed_at=datetime.now(UTC))
+        id2 = cache_service.save_diagnosis(diagnosis2)
 
         # IDs should be different (new record created)
         assert id1 != id2
 
         # Only one cached result should exist
-        cached = diagnosis_service.get_cached_diagnosis(str(sample_csv))
+        cached = cache_service.get_cached_diagnosis(sample_csv_str)
         assert cached is not None
 
     def test_cached_diagnosis_preserves_schema(
-        self, diagnosis_service: FileDiagnosisService, sample_csv: Path
+        self,
+        cache_service: FileDiagnosisService,
+        diagnosed_sample: FileDiagnosis,
+        sample_csv_str: str,
     ):
         """Test that cached diagnosis preserves schema information."""
-        diagnosis = diagnosis_service.diagnose_file(str(sample_csv), "csv")
-        diagnosis_service.save_diagnosis(diagnosis)
+        diagnosis = diagnosed_sample
+        cache_service.save_diagnosis(diagnosis)
 
-        cached = diagnosis_service.get_cached_diagnosis(str(sample_csv))
+        cached = cache_service.get_cached_diagnosis(sample_csv_str)
         assert cached is not None
 
         # Check schema is preserved
-        for orig_col, cached_col in zip(diagnosis.schema, cached.schema):
-            assert orig_col.name == cached_col.name
-            assert orig_col.type == cached_col.type
-            assert orig_col.nullable == cached_col.nullable
+        assert [(col.name, col.type, col.nullable) for col in cached.schema] == [
+            (col.name, col.type, col.nullable) for col in diagnosis.schema
+        ]
 
     def test_cached_diagnosis_preserves_missing_values(
-        self, diagnosis_service: FileDiagnosisService, sample_csv: Path
+        self,
+        cache_service: FileDiagnosisService,
+        diagnosed_sample: FileDiagnosis,
+        sample_csv_str: str,
     ):
         """Test that cached diagnosis preserves missing values."""
-        diagnosis = diagnosis_service.diagnose_file(str(sample_csv), "csv")
-        diagnosis_service.save_diagnosis(diagnosis)
+        diagnosis = diagnosed_sample
+        cache_service.save_diagnosis(diagnosis)
 
-        cached = diagnosis_service.get_cached_diagnosis(str(sample_csv))
+        cached = cache_service.get_cached_diagnosis(sample_csv_str)
         assert cached is not None
 
         assert cached.missing_values == diagnosis.missing_values
 
     def test_delete_cached_diagnosis(
-        self, diagnosis_service: FileDiagnosisService, sample_csv: Path
+        self,
+        cache_service: FileDiagnosisService,
+        diagnosed_sample: FileDiagnosis,
+        sample_csv_str: str,
     ):
         """Test deleting a cached diagnosis."""
-        diagnosis = diagnosis_service.diagnose_file(str(sample_csv), "csv")
-        diagnosis_service.save_diagnosis(diagnosis)
+        diagnosis = diagnosed_sample
+        cache_service.save_diagnosis(diagnosis)
 
         # Verify it exists
-        assert diagnosis_service.get_cached_diagnosis(str(sample_csv)) is not None
+        assert cache_service.get_cached_diagnosis(sample_csv_str) is not None
 
         # Delete it
-        diagnosis_service.delete_cached_diagnosis(str(sample_csv))
+        cache_service.delete_cached_diagnosis(sample_csv_str)
 
         # Verify it's gone
-        assert diagnosis_service.get_cached_diagnosis(str(sample_csv)) is None
+        assert cache_service.get_cached_diagnosis(sample_csv_str) is None
 
     def test_cached_diagnosis_preserves_llm_analysis(
-        self, diagnosis_service: FileDiagnosisService, sample_csv: Path
+        self,
+        cache_service: FileDiagnosisService,
+        fresh_diagnosis: FileDiagnosis,
+        sample_csv_str: str,
+        llm_analysis_result: LLMAnalysisResult,
     ):
         """Test that cached diagnosis preserves LLM analysis results."""
-        from datetime import timezone
-        from pluto_duck_backend.app.services.asset.file_diagnosis_service import (
-            LLMAnalysisResult,
-            PotentialItem,
-            IssueItem,
-        )
-
-        diagnosis = diagnosis_service.diagnose_file(str(sample_csv), "csv")
+        diagnosis = fresh_diagnosis
 
         # Add LLM analysis to the diagnosis
-        diagnosis.llm_analysis = LLMAnalysisResult(
-            suggested_name="test_dataset",
-            context="This is a test dataset for unit testing.",
-            potential=[
-                PotentialItem(question="What is the data about?", analysis="Analyze columns"),
-                PotentialItem(question="Any patterns?", analysis="Check distributions"),
-            ],
-            issues=[
-                IssueItem(issue="Missing values", suggestion="Fill or remove nulls"),
-            ],
-            analyzed_at=diagnosis.diagnosed_at,
-            model_used="test-model",
-        )
+        diagnosis.llm_analysis = llm_analysis_result
 
         # Save the diagnosis with LLM analysis
-        diagnosis_service.save_diagnosis(diagnosis)
+        cache_service.save_diagnosis(diagnosis)
 
         # Retrieve and verify LLM analysis is preserved
-        cached = diagnosis_service.get_cached_diagnosis(str(sample_csv))
+        cached = cache_service.get_cached_diagnosis(sample_csv_str)
         assert cached is not None
         assert cached.llm_analysis is not None
 
@@ -483,17 +587,20 @@ class TestDiagnosisCaching:
         assert cached.llm_analysis.model_used == "test-model"
 
     def test_cached_diagnosis_without_llm_analysis(
-        self, diagnosis_service: FileDiagnosisService, sample_csv: Path
+        self,
+        cache_service: FileDiagnosisService,
+        fresh_diagnosis: FileDiagnosis,
+        sample_csv_str: str,
     ):
         """Test that diagnosis without LLM analysis can be cached and retrieved."""
-        diagnosis = diagnosis_service.diagnose_file(str(sample_csv), "csv")
+        diagnosis = fresh_diagnosis
 
         # Ensure no LLM analysis
         assert diagnosis.llm_analysis is None
 
         # Save and retrieve
-        diagnosis_service.save_diagnosis(diagnosis)
-        cached = diagnosis_service.get_cached_diagnosis(str(sample_csv))
+        cache_service.save_diagnosis(diagnosis)
+        cached = cache_service.get_cached_diagnosis(sample_csv_str)
 
         assert cached is not None
         assert cached.llm_analysis is None
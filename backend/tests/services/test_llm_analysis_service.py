@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+import dataclasses
 import json
 from datetime import datetime, timezone
 from typing import List
@@ -17,9 +19,14 @@ from pluto_duck_backend.app.services.asset.file_diagnosis_service import (
     LLMAnalysisResult,
     PotentialItem,
 )
+from pluto_duck_backend.app.services.asset import llm_analysis_service
 from pluto_duck_backend.app.services.asset.llm_analysis_service import (
     LLM_BATCH_SIZE,
-    BatchLLMAnalysisResult,
+    MAX_BATCH_TOKENS,
+    MAX_COLUMN_STATISTICS,
+    _batch_formatted,
+    _format_diagnoses_payload,
+    _prompt_parts,
     analyze_batch_with_llm,
     analyze_datasets_with_llm,
     format_diagnoses_for_llm,
@@ -30,12 +37,13 @@ from pluto_duck_backend.app.services.llm import (
     IssueItemSchema,
     LLMService,
     PotentialItemSchema,
+    TokenUsage,
 )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_diagnosis() -> FileDiagnosis:
-    """Create a sample FileDiagnosis for testing."""
+    """Create a sample FileDiagnosis shared by the module (tests must not mutate it)."""
     return FileDiagnosis(
         file_path="/tmp/sales_data.csv",
         file_type="csv",
@@ -74,7 +82,7 @@ def sample_diagnosis() -> FileDiagnosis:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_diagnoses(sample_diagnosis: FileDiagnosis) -> List[FileDiagnosis]:
     """Create multiple sample FileDiagnosis for batch testing."""
     diag2 = FileDiagnosis(
@@ -98,6 +106,35 @@ def sample_diagnoses(sample_diagnosis: FileDiagnosis) -> List[FileDiagnosis]:
     return [sample_diagnosis, diag2]
 
 
+class StubLLMService:
+    """Minimal LLMService stand-in that returns a fixed response without call tracking."""
+
+    def __init__(self, response: BatchAnalysisSchema, model_name: str = "test-model") -> None:
+        self.response = response
+        self.model_name = model_name
+        self.total_tokens_used = 0
+
+    async def complete_structured(
+        self, prompt: str, response_schema: type, usage: TokenUsage | None = None
+    ) -> BatchAnalysisSchema:
+        return self.response
+
+
+@pytest.fixture(scope="module")
+def mock_llm_service() -> MagicMock:
+    """LLMService mock shared by the module; the spec is introspected once."""
+    return MagicMock(spec=LLMService)
+
+
+@pytest.fixture(autouse=True)
+def reset_llm_service_mock(mock_llm_service: MagicMock) -> None:
+    """Give each test a clean mock with a fresh complete_structured."""
+    mock_llm_service.reset_mock(return_value=True, side_effect=True)
+    mock_llm_service.model_name = "test-model"
+    mock_llm_service.total_tokens_used = 0
+    mock_llm_service.complete_structured = AsyncMock()
+
+
 class TestFormatDiagnosesForLLM:
     """Test format_diagnoses_for_llm function."""
 
@@ -120,11 +157,25 @@ class TestFormatDiagnosesForLLM:
         assert len(item["schema"]) == 4
         assert len(item["sample_rows"]) <= 5
 
+    def test_format_uses_compact_separators(self, sample_diagnosis: FileDiagnosis):
+        """Test that the JSON carries no indentation or padding."""
+        result = format_diagnoses_for_llm([sample_diagnosis])
+
+        assert "\n" not in result
+        assert ", " not in result
+        assert ": " not in result
+
+    def test_format_huge_integers(self, sample_diagnosis: FileDiagnosis):
+        """Test that sample values beyond 64 bits still serialize."""
+        diagnosis = dataclasses.replace(sample_diagnosis, sample_rows=[[2**70]])
+
+        data = json.loads(format_diagnoses_for_llm([diagnosis]))
+
+        assert data[0]["sample_rows"] == [[2**70]]
+
     def test_format_multiple_diagnoses(self, sample_diagnoses: List[FileDiagnosis]):
         """Test formatting multiple diagnoses."""
-        result = format_diagnoses_for_llm(sample_diagnoses)
-
-        data = json.loads(result)
+        data = _format_diagnoses_payload(sample_diagnoses)
 
         assert len(data) == 2
         assert data[0]["file_path"] == "/tmp/sales_data.csv"
@@ -132,44 +183,56 @@ class TestFormatDiagnosesForLLM:
 
     def test_format_empty_list(self):
         """Test formatting empty list."""
-        result = format_diagnoses_for_llm([])
-
-        data = json.loads(result)
-        assert data == []
+        assert _format_diagnoses_payload([]) == []
+        assert format_diagnoses_for_llm([]) == "[]"
 
     def test_format_includes_column_statistics(self, sample_diagnosis: FileDiagnosis):
         """Test that column statistics are included."""
-        result = format_diagnoses_for_llm([sample_diagnosis])
-
-        data = json.loads(result)
-        item = data[0]
+        item = _format_diagnoses_payload([sample_diagnosis])[0]
 
         assert "column_statistics" in item
         assert len(item["column_statistics"]) == 2
         assert item["column_statistics"][0]["column_name"] == "id"
         assert item["column_statistics"][0]["semantic_type"] == "numeric"
 
+    def test_format_caps_column_statistics(self, sample_diagnosis: FileDiagnosis):
+        """Test that only the first MAX_COLUMN_STATISTICS statistics are sent."""
+        statistics = [
+            ColumnStatistics(
+                column_name=f"col_{i}",
+                column_type="BIGINT",
+                semantic_type="numeric",
+                null_count=0,
+                null_percentage=0.0,
+            )
+            for i in range(MAX_COLUMN_STATISTICS + 30)
+        ]
+        diagnosis = dataclasses.replace(sample_diagnosis, column_statistics=statistics)
+
+        item = _format_diagnoses_payload([diagnosis])[0]
+
+        assert len(item["column_statistics"]) == MAX_COLUMN_STATISTICS
+        assert item["column_statistics"][-1]["column_name"] == f"col_{MAX_COLUMN_STATISTICS - 1}"
+
 
 class TestAnalyzeBatchWithLLM:
     """Test analyze_batch_with_llm function."""
 
-    @pytest.mark.asyncio
-    async def test_analyze_batch_success(self, sample_diagnosis: FileDiagnosis):
+    @pytest.mark.asyncio(scope="module")
+    async def test_analyze_batch_success(
+        self, sample_diagnosis: FileDiagnosis, mock_llm_service: MagicMock
+    ):
         """Test successful batch analysis."""
-        mock_llm_service = MagicMock(spec=LLMService)
-        mock_llm_service.model_name = "test-model"
-        mock_llm_service.complete_structured = AsyncMock(
-            return_value=BatchAnalysisSchema(
-                files=[
-                    FileAnalysisSchema(
-                        file_path="/tmp/sales_data.csv",
-                        suggested_name="sales_data",
-                        context="Sales transaction data",
-                        potential=[PotentialItemSchema(question="Q1", analysis="A1")],
-                        issues=[],
-                    )
-                ]
-            )
+        mock_llm_service.complete_structured.return_value = BatchAnalysisSchema(
+            files=[
+                FileAnalysisSchema(
+                    file_path="/tmp/sales_data.csv",
+                    suggested_name="sales_data",
+                    context="Sales transaction data",
+                    potential=[PotentialItemSchema(question="Q1", analysis="A1")],
+                    issues=[],
+                )
+            ]
         )
 
         result = await analyze_batch_with_llm([sample_diagnosis], mock_llm_service)
@@ -179,40 +242,76 @@ class TestAnalyzeBatchWithLLM:
         assert result.file_results["/tmp/sales_data.csv"].suggested_name == "sales_data"
         mock_llm_service.complete_structured.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_analyze_empty_batch(self):
+    @pytest.mark.asyncio(scope="module")
+    async def test_analyze_empty_batch(self, mock_llm_service: MagicMock):
         """Test analyzing empty batch."""
-        mock_llm_service = MagicMock(spec=LLMService)
-
         result = await analyze_batch_with_llm([], mock_llm_service)
 
         assert result.file_results == {}
         mock_llm_service.complete_structured.assert_not_called()
 
-    @pytest.mark.asyncio
-    async def test_analyze_batch_handles_llm_error(self, sample_diagnosis: FileDiagnosis):
+    @pytest.mark.asyncio(scope="module")
+    async def test_analyze_batch_handles_llm_error(
+        self, sample_diagnosis: FileDiagnosis, mock_llm_service: MagicMock
+    ):
         """Test that LLM errors are handled gracefully."""
-        mock_llm_service = MagicMock(spec=LLMService)
-        mock_llm_service.complete_structured = AsyncMock(side_effect=Exception("LLM API error"))
+        mock_llm_service.complete_structured.side_effect = Exception("LLM API error")
 
         result = await analyze_batch_with_llm([sample_diagnosis], mock_llm_service)
 
         assert result.file_results == {}
 
+    @pytest.mark.asyncio(scope="module")
+    async def test_dedupes_repeated_file_paths(
+        self, sample_diagnosis: FileDiagnosis, mock_llm_service: MagicMock
+    ):
+        """Test that a file repeated in the batch is sent to the LLM once, as first seen."""
+        mock_llm_service.complete_structured.return_value = BatchAnalysisSchema(files=[])
+        repeat = dataclasses.replace(sample_diagnosis, row_count=987654)
+
+        await analyze_batch_with_llm([sample_diagnosis, repeat], mock_llm_service)
+
+        mock_llm_service.complete_structured.assert_called_once()
+        prompt = mock_llm_service.complete_structured.call_args.kwargs["prompt"]
+        assert prompt.count(sample_diagnosis.file_path) == 1
+        assert "987654" not in prompt
+
+    @pytest.mark.asyncio(scope="module")
+    async def test_prompts_share_static_prefix(
+        self, sample_diagnoses: List[FileDiagnosis], mock_llm_service: MagicMock
+    ):
+        """Test that the instructions precede the payload so providers can cache them."""
+        mock_llm_service.complete_structured.return_value = BatchAnalysisSchema(files=[])
+
+        for diagnosis in sample_diagnoses:
+            await analyze_batch_with_llm([diagnosis], mock_llm_service)
+
+        prefix, _ = _prompt_parts()
+        prompts = [
+            call.kwargs["prompt"]
+            for call in mock_llm_service.complete_structured.call_args_list
+        ]
+        assert len(prompts) == 2
+        assert prompts[0] != prompts[1]
+        assert prefix and all(prompt.startswith(prefix) for prompt in prompts)
+        assert "{input_json}" not in prefix
+
 
 class TestAnalyzeDatasetsWithLLM:
     """Test analyze_datasets_with_llm function."""
 
-    @pytest.mark.asyncio
-    async def test_batching(self, sample_diagnoses: List[FileDiagnosis]):
+    @pytest.mark.asyncio(scope="module")
+    async def test_batching(
+        self, sample_diagnosis: FileDiagnosis, mock_llm_service: MagicMock
+    ):
         """Test that large inputs are batched correctly."""
-        # Create more diagnoses than batch size
-        diagnoses = sample_diagnoses * 3  # 6 diagnoses
+        diagnoses = [
+            dataclasses.replace(sample_diagnosis, file_path=f"/tmp/file_{i}.csv")
+            for i in range(LLM_BATCH_SIZE * 2 + 1)
+        ]
 
-        mock_llm_service = MagicMock(spec=LLMService)
-        mock_llm_service.model_name = "test-model"
-        mock_llm_service.complete_structured = AsyncMock(
-            return_value=BatchAnalysisSchema(
+        async def complete_structured(prompt, response_schema, usage=None):
+            return BatchAnalysisSchema(
                 files=[
                     FileAnalysisSchema(
                         file_path=d.file_path,
@@ -221,31 +320,31 @@ class TestAnalyzeDatasetsWithLLM:
                         potential=[],
                         issues=[],
                     )
-                    for d in sample_diagnoses
+                    for d in diagnoses
+                    if f'"{d.file_path}"' in prompt
                 ]
             )
-        )
 
-        # We can't easily test batching with gather, but we can verify the function works
-        result = await analyze_datasets_with_llm(diagnoses[:2], mock_llm_service)
+        mock_llm_service.complete_structured = AsyncMock(side_effect=complete_structured)
+
+        result = await analyze_datasets_with_llm(diagnoses, mock_llm_service)
 
-        # Should have results for the diagnoses
-        assert isinstance(result, BatchLLMAnalysisResult)
+        # Three batches, each answering for its own files, merged into one result
+        assert mock_llm_service.complete_structured.await_count == 3
+        assert set(result.file_results) == {d.file_path for d in diagnoses}
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(scope="module")
     async def test_empty_input(self):
         """Test with empty input."""
         result = await analyze_datasets_with_llm([])
 
         assert result.file_results == {}
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(scope="module")
     async def test_with_mock_service(self, sample_diagnosis: FileDiagnosis):
         """Test full flow with mock LLM service."""
-        mock_llm_service = MagicMock(spec=LLMService)
-        mock_llm_service.model_name = "mock-model"
-        mock_llm_service.complete_structured = AsyncMock(
-            return_value=BatchAnalysisSchema(
+        llm_service = StubLLMService(
+            BatchAnalysisSchema(
                 files=[
                     FileAnalysisSchema(
                         file_path="/tmp/sales_data.csv",
@@ -255,20 +354,172 @@ class TestAnalyzeDatasetsWithLLM:
                         issues=[],
                     )
                 ]
-            )
+            ),
+            model_name="mock-model",
         )
 
-        result = await analyze_datasets_with_llm([sample_diagnosis], mock_llm_service)
+        result = await analyze_datasets_with_llm([sample_diagnosis], llm_service)
 
         assert len(result.file_results) == 1
         file_result = result.file_results["/tmp/sales_data.csv"]
         assert file_result.suggested_name == "analyzed_data"
         assert file_result.model_used == "mock-model"
 
+    @pytest.mark.asyncio(scope="module")
+    async def test_batches_dispatched_concurrently(
+        self, sample_diagnosis: FileDiagnosis, mock_llm_service: MagicMock
+    ):
+        """Test that every batch is in flight before any of them completes."""
+        diagnoses = [
+            dataclasses.replace(sample_diagnosis, file_path=f"/tmp/file_{i}.csv")
+            for i in range(LLM_BATCH_SIZE * 3)
+        ]
+        in_flight = 0
+        all_started = asyncio.Event()
+
+        async def complete_structured(prompt, response_schema, usage=None):
+            nonlocal in_flight
+            in_flight += 1
+            if in_flight == 3:
+                all_started.set()
+            await all_started.wait()
+            return BatchAnalysisSchema(
+                files=[
+                    FileAnalysisSchema(
+                        file_path=d.file_path,
+                        suggested_name="test",
+                        context="ctx",
+                        potential=[],
+                        issues=[],
+                    )
+                    for d in diagnoses
+                    if d.file_path in prompt
+                ]
+            )
+
+        mock_llm_service.complete_structured = complete_structured
+
+        result = await asyncio.wait_for(
+            analyze_datasets_with_llm(diagnoses, mock_llm_service), timeout=5
+        )
+
+        assert in_flight == 3
+        assert len(result.file_results) == len(diagnoses)
+
+    @pytest.mark.asyncio(scope="module")
+    async def test_respects_max_concurrency(
+        self,
+        sample_diagnosis: FileDiagnosis,
+        mock_llm_service: MagicMock,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Test that no more than LLM_MAX_CONCURRENCY batches run at once."""
+        monkeypatch.setattr(llm_analysis_service, "LLM_MAX_CONCURRENCY", 2)
+        diagnoses = [
+            dataclasses.replace(sample_diagnosis, file_path=f"/tmp/file_{i}.csv")
+            for i in range(LLM_BATCH_SIZE * 5)
+        ]
+        in_flight = 0
+        max_in_flight = 0
+
+        async def complete_structured(prompt, response_schema, usage=None):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return BatchAnalysisSchema(files=[])
+
+        mock_llm_service.complete_structured = complete_structured
+
+        await analyze_datasets_with_llm(diagnoses, mock_llm_service)
+
+        assert max_in_flight == 2
+
+    @pytest.mark.asyncio(scope="module")
+    async def test_budget_cancels_remaining_batches(
+        self, sample_diagnosis: FileDiagnosis, mock_llm_service: MagicMock
+    ):
+        """Test that pending batches are cancelled once the token budget is exceeded."""
+        diagnoses = [
+            dataclasses.replace(sample_diagnosis, file_path=f"/tmp/file_{i}.csv")
+            for i in range(LLM_BATCH_SIZE * 3)
+        ]
+
+        mock_llm_service.model_name = "mock-model"
+        # Tokens spent by other analyses on the shared service don't count
+        mock_llm_service.total_tokens_used = 100_000
+        calls = 0
+
+        async def complete_structured(prompt, response_schema, usage=None):
+            nonlocal calls
+            calls += 1
+            if calls > 1:
+                await asyncio.sleep(10)
+            usage.total_tokens += 1000
+            paths = [d.file_path for d in diagnoses if d.file_path in prompt]
+            return BatchAnalysisSchema(
+                files=[
+                    FileAnalysisSchema(
+                        file_path=path,
+                        suggested_name="test",
+                        context="ctx",
+                        potential=[],
+                        issues=[],
+                    )
+                    for path in paths
+                ]
+            )
+
+        mock_llm_service.complete_structured = complete_structured
+
+        result = await asyncio.wait_for(
+            analyze_datasets_with_llm(diagnoses, mock_llm_service, budget_tokens=500),
+            timeout=5,
+        )
+
+        assert len(result.file_results) == LLM_BATCH_SIZE
+
 
 class TestLLMBatchSize:
     """Test batch size constant."""
 
+    def test_batcher_respects_token_budget(self, sample_diagnosis: FileDiagnosis):
+        """Test that a diagnosis over the token budget ships alone."""
+        huge = dataclasses.replace(
+            sample_diagnosis,
+            file_path="/tmp/huge.csv",
+            sample_rows=[["x" * (MAX_BATCH_TOKENS * 4)]],
+        )
+
+        batches = [
+            batch for batch, _ in _batch_formatted([sample_diagnosis, huge, sample_diagnosis])
+        ]
+
+        assert [len(batch) for batch in batches] == [1, 1, 1]
+        assert batches[1] == [huge]
+
+    def test_batcher_packs_small_diagnoses(self, sample_diagnosis: FileDiagnosis):
+        """Test that small diagnoses share batches of up to LLM_BATCH_SIZE files."""
+        diagnoses = [sample_diagnosis] * (LLM_BATCH_SIZE * 2 + 1)
+
+        batches = [batch for batch, _ in _batch_formatted(diagnoses)]
+
+        assert [len(batch) for batch in batches] == [LLM_BATCH_SIZE, LLM_BATCH_SIZE, 1]
+
+    def test_batcher_handles_huge_integers(self, sample_diagnosis: FileDiagnosis):
+        """Test that sample values beyond 64 bits don't break batching."""
+        huge = dataclasses.replace(
+            sample_diagnosis, file_path="/tmp/huge.csv", sample_rows=[[2**70]]
+        )
+
+        batches = _batch_formatted([sample_diagnosis, huge])
+
+        assert len(batches) == 1
+        batch, input_json = batches[0]
+        assert batch == [sample_diagnosis, huge]
+        assert json.loads(input_json)[1]["sample_rows"] == [[2**70]]
+
     def test_batch_size_is_reasonable(self):
         """Test that batch size is set to a reasonable value."""
         assert LLM_BATCH_SIZE > 0
@@ -0,0 +1,29 @@
+"""Tests for the LLM service model caching."""
+
+from __future__ import annotations
+
+import asyncio
+
+from pluto_duck_backend.app.services.llm.service import _build_chat_model
+
+MODEL_KEY = ("openai", "gpt-4o-mini", "sk-test", None)
+
+
+def test_chat_model_is_shared_within_a_loop() -> None:
+    async def build_twice():
+        return _build_chat_model(*MODEL_KEY), _build_chat_model(*MODEL_KEY)
+
+    first, second = asyncio.run(build_twice())
+
+    assert first is second
+
+
+def test_chat_model_is_not_shared_across_loops() -> None:
+    async def build():
+        return _build_chat_model(*MODEL_KEY)
+
+    first = asyncio.run(build())
+    second = asyncio.run(build())
+
+    assert first is not second
+    assert _build_chat_model(*MODEL_KEY) is not _build_chat_model(*MODEL_KEY)
@@ -0,0 +1,196 @@
+"""Tests for the Projects repository."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from pluto_duck_backend.app.services.boards import BoardsRepository
+from pluto_duck_backend.app.services.chat.repository import ChatRepository
+from pluto_duck_backend.app.services.projects.repository import ProjectRepository
+
+
+@pytest.fixture
+def temp_warehouse(tmp_path: Path) -> Path:
+    """Create a temporary warehouse database with the project tables."""
+    warehouse = tmp_path / "warehouse.duckdb"
+    ChatRepository(warehouse)
+    return warehouse
+
+
+@pytest.fixture
+def repo(temp_warehouse: Path) -> ProjectRepository:
+    """Create a ProjectRepository on the temporary warehouse."""
+    return ProjectRepository(temp_warehouse)
+
+
+def _count(repo: ProjectRepository, table: str) -> int:
+    with repo._connect() as con:
+        return con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+class TestProjectDelete:
+    """Test project deletion."""
+
+    def test_delete_project_cascades(self, repo: ProjectRepository, temp_warehouse: Path):
+        project_id = repo.create_project("Analysis")
+        boards = BoardsRepository(temp_warehouse)
+        board_id = boards.create_board(project_id, "Board")
+        item_id = boards.create_item(board_id, "chart", {})
+        boards.create_query(item_id, "SELECT 1")
+        boards.create_asset(item_id, "image", "a.png", "/tmp/a.png")
+        chat = ChatRepository(temp_warehouse)
+        conversation_id = "00000000-0000-0000-0000-0000000000c1"
+        chat.create_conversation(conversation_id, "Question", {"project_id": project_id})
+        chat.append_message(conversation_id, "user", {"text": "hi"})
+
+        repo.delete_project(project_id)
+
+        assert repo.get_project(project_id) is None
+        for table in (
+            "boards",
+            "board_items",
+            "board_queries",
+            "board_item_assets",
+            "agent_conversations",
+            "agent_messages",
+        ):
+            assert _count(repo, table) == 0, table
+
+    def test_delete_project_clears_board_caches(
+        self, repo: ProjectRepository, temp_warehouse: Path
+    ):
+        project_id = repo.create_project("Analysis")
+        boards = BoardsRepository(temp_warehouse)
+        board_id = boards.create_board(project_id, "Board")
+        item_id = boards.create_item(board_id, "chart", {})
+        query_id = boards.create_query(item_id, "SELECT 1")
+        boards.update_query_result(query_id, {"rows": [[1]]}, 1, "success")
+        assert len(boards.list_items(board_id)) == 1
+        assert boards.get_cached_snapshot(query_id) == {"rows": [[1]]}
+
+        repo.delete_project(project_id)
+
+        assert boards.list_items(board_id) == []
+        assert boards.get_cached_snapshot(query_id) is None
+
+    def test_delete_missing_project(self, repo: ProjectRepository):
+        with pytest.raises(ValueError, match="not found"):
+            repo.delete_project("00000000-0000-0000-0000-00000000ffff")
+
+    def test_delete_default_project(self, repo: ProjectRepository, temp_warehouse: Path):
+        default_id = ChatRepository(temp_warehouse)._default_project_id
+        BoardsRepository(temp_warehouse).create_board(default_id, "Board")
+
+        with pytest.raises(ValueError, match="default project"):
+            repo.delete_project(default_id)
+
+        assert repo.get_project(default_id) is not None
+        assert _count(repo, "boards") == 1
+
+
+class TestProjectCreate:
+    """Test project creation."""
+
+    def test_timestamps_are_utc(self, repo: ProjectRepository):
+        before = datetime.now(UTC).replace(tzinfo=None)
+        project = repo.get_project(repo.create_project("Analysis"))
+        after = datetime.now(UTC).replace(tzinfo=None)
+
+        created_at = datetime.fromisoformat(project["created_at"])
+        assert before - timedelta(seconds=1) <= created_at <= after + timedelta(seconds=1)
+        assert project["updated_at"] == project["created_at"]
+
+
+class TestProjectCache:
+    """Test the in-memory project cache."""
+
+    def test_cached_project_is_isolated_from_callers(self, repo: ProjectRepository):
+        project_id = repo.create_project("Analysis")
+
+        project = repo.get_project(project_id)
+        project["settings"]["leak"] = True
+
+        assert repo.get_project(project_id)["settings"] == {}
+
+    def test_update_settings_invalidates_cache(self, repo: ProjectRepository):
+        project_id = repo.create_project("Analysis")
+        assert repo.get_project(project_id)["settings"] == {}
+
+        repo.update_project_settings(project_id, {"preferences": {"theme": "dark"}})
+
+        assert repo.get_project(project_id)["settings"] == {"preferences": {"theme": "dark"}}
+
+    def test_delete_invalidates_cache(self, repo: ProjectRepository):
+        project_id = repo.create_project("Analysis")
+        assert repo.get_project(project_id) is not None
+
+        repo.delete_project(project_id)
+
+        assert repo.get_project(project_id) is None
+
+
+class TestProjectSettings:
+    """Test project settings updates."""
+
+    def test_ui_state_keys_are_replaced_individually(self, repo: ProjectRepository):
+        project_id = repo.create_project("Analysis")
+        repo.update_project_settings(
+            project_id,
+            {
+                "ui_state": {"chat": {"open_tabs": [1], "active_tab_id": "a"}, "board": "b1"},
+                "preferences": {"theme": "dark", "font": "mono"},
+            },
+        )
+
+        repo.update_project_settings(
+            project_id,
+            {"ui_state": {"chat": {"open_tabs": [2]}}, "preferences": {"theme": "light"}},
+        )
+
+        # As before, other keys sent alongside an existing ui_state are ignored
+        assert repo.get_project(project_id)["settings"] == {
+            "ui_state": {"chat": {"open_tabs": [2]}, "board": "b1"},
+            "preferences": {"theme": "dark", "font": "mono"},
+        }
+
+    def test_null_values_are_stored(self, repo: ProjectRepository):
+        project_id = repo.create_project("Analysis")
+        repo.update_project_settings(project_id, {"ui_state": {"a": 1, "b": 2}})
+
+        repo.update_project_settings(project_id, {"preferences": {"font": None}})
+        repo.update_project_settings(project_id, {"ui_state": {"a": None}})
+
+        assert repo.get_project(project_id)["settings"] == {
+            "ui_state": {"a": None, "b": 2},
+            "preferences": {"font": None},
+        }
+
+    def test_update_missing_project(self, repo: ProjectRepository):
+        with pytest.raises(ValueError, match="not found"):
+            repo.update_project_settings("00000000-0000-0000-0000-00000000ffff", {"preferences": {}})
+
+
+class TestProjectList:
+    """Test project listing."""
+
+    def test_list_projects_counts_children(self, repo: ProjectRepository, temp_warehouse: Path):
+        project_id = repo.create_project("Analysis")
+        boards = BoardsRepository(temp_warehouse)
+        boards.create_board(project_id, "One")
+        boards.create_board(project_id, "Two")
+        chat = ChatRepository(temp_warehouse)
+        for suffix in ("c1", "c2", "c3"):
+            chat.create_conversation(
+                f"00000000-0000-0000-0000-0000000000{suffix}", "Question", {"project_id": project_id}
+            )
+
+        projects = {project["id"]: project for project in repo.list_projects()}
+
+        assert projects[project_id]["board_count"] == 2
+        assert projects[project_id]["conversation_count"] == 3
+        default = next(project for project in projects.values() if project["is_default"])
+        assert default["board_count"] == 0
+        assert default["conversation_count"] == 0
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import json
+import os
 import tempfile
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
@@ -16,13 +18,16 @@ from pluto_duck_backend.app.services.source import (
     AttachError,
     CacheError,
     SourceNotFoundError,
+    reset_source_metadata,
 )
+from pluto_duck_backend.app.services.duckdb_utils import close_warehouse_pools
 
 
 @pytest.fixture
-def temp_warehouse(tmp_path: Path) -> Path:
-    """Create a temporary warehouse database."""
-    return tmp_path / "warehouse.duckdb"
+def temp_warehouse(tmp_path: Path):
+    """Create a temporary warehouse database whose pool is closed afterwards."""
+    yield tmp_path / "warehouse.duckdb"
+    close_warehouse_pools()
 
 
 @pytest.fixture
@@ -52,6 +57,15 @@ def sample_sqlite_db(tmp_path: Path) -> Path:
     return db_path
 
 
+@pytest.fixture
+def sample_duckdb_db(tmp_path: Path) -> Path:
+    """Create a sample DuckDB database (attachable without extensions)."""
+    db_path = tmp_path / "other.duckdb"
+    with duckdb.connect(str(db_path)) as con:
+        con.execute("CREATE TABLE t AS SELECT 1 AS x")
+    return db_path
+
+
 class TestSourceServiceInit:
     """Test SourceService initialization."""
 
@@ -167,6 +181,176 @@ class TestAttachSource:
         assert source_service.detach_source("nonexistent") is False
 
 
+    def test_attached_source_is_shared_by_pooled_cursors(
+        self, source_service: SourceService, sample_duckdb_db: Path
+    ):
+        """Test that an attached DuckDB file stays visible to later cursors."""
+        other_db = sample_duckdb_db
+        source_service.attach_source(
+            name="other",
+            source_type=SourceType.DUCKDB,
+            config={"path": str(other_db)},
+        )
+
+        [source] = source_service.list_sources()
+        assert source.name == "other"
+        assert source.connection_config == {"path": str(other_db)}
+        assert source.attached_at.tzinfo is not None
+        assert source.table_count == 0
+
+        with source_service._connect_with_sources(["other"]) as con:
+            assert con.execute("SELECT x FROM other.t").fetchall() == [(1,)]
+
+        assert source_service.detach_source("other") is True
+        with source_service._connect() as con:
+            databases = con.execute("SELECT database_name FROM duckdb_databases()").fetchall()
+        assert ("other",) not in databases
+
+
+    def test_reattach_with_new_config(
+        self, source_service: SourceService, sample_duckdb_db: Path, tmp_path: Path
+    ):
+        """Test that attaching an existing name again switches to the new config."""
+        second_db = tmp_path / "second.duckdb"
+        with duckdb.connect(str(second_db)) as con:
+            con.execute("CREATE TABLE t AS SELECT 2 AS x")
+        source_service.attach_source(
+            name="other", source_type=SourceType.DUCKDB, config={"path": str(sample_duckdb_db)}
+        )
+
+        source = source_service.attach_source(
+            name="other", source_type=SourceType.DUCKDB, config={"path": str(second_db)}
+        )
+
+        assert source.status == "attached"
+        assert source_service.get_source("other").status == "attached"
+        with source_service._connect_with_sources(["other"]) as con:
+            assert con.execute("SELECT x FROM other.t").fetchall() == [(2,)]
+
+    def test_failed_reattach_forgets_old_attachment(
+        self, source_service: SourceService, sample_duckdb_db: Path, tmp_path: Path
+    ):
+        """Test that a failed re-attach doesn't leave the old attachment marked current."""
+        source_service.attach_source(
+            name="other", source_type=SourceType.DUCKDB, config={"path": str(sample_duckdb_db)}
+        )
+
+        with pytest.raises(AttachError):
+            source_service.attach_source(
+                name="other",
+                source_type=SourceType.DUCKDB,
+                config={"path": str(tmp_path / "missing.duckdb")},
+            )
+
+        assert "other" not in source_service._attached_names()
+        with source_service._connect() as con:
+            databases = con.execute("SELECT database_name FROM duckdb_databases()").fetchall()
+        assert ("other",) not in databases
+
+    def test_read_write_attach_is_not_left_on_shared_cursors(
+        self, source_service: SourceService, sample_duckdb_db: Path
+    ):
+        """Test that a read-write attach is re-attached read-only for later queries."""
+        source_service.attach_source(
+            name="other",
+            source_type=SourceType.DUCKDB,
+            config={"path": str(sample_duckdb_db)},
+            read_only=False,
+        )
+
+        with source_service._connect() as con:
+            databases = con.execute("SELECT database_name FROM duckdb_databases()").fetchall()
+        assert ("other",) not in databases
+        with source_service._connect_with_sources(["other"]) as con:
+            with pytest.raises(duckdb.Error):
+                con.execute("INSERT INTO other.t VALUES (2)")
+
+    def test_connect_with_no_sources(self, source_service: SourceService):
+        """Test that an empty source list attaches nothing."""
+        with source_service._connect_with_sources([]) as con:
+            assert con.execute("SELECT 1").fetchone() == (1,)
+
+    def test_reattach_several_sources(
+        self, source_service: SourceService, sample_duckdb_db: Path, tmp_path: Path
+    ):
+        """Test that several sources are re-attached together, skipping broken ones."""
+        second_db = tmp_path / "second.duckdb"
+        with duckdb.connect(str(second_db)) as con:
+            con.execute("CREATE TABLE t AS SELECT 2 AS x")
+        for name, path in (("first", sample_duckdb_db), ("broken", second_db)):
+            source_service.attach_source(
+                name=name, source_type=SourceType.DUCKDB, config={"path": str(path)}
+            )
+        # A fresh pool starts without attachments
+        close_warehouse_pools()
+        second_db.rename(tmp_path / "moved.duckdb")
+
+        with source_service._connect_with_sources(["first", "broken"]) as con:
+            assert con.execute("SELECT x FROM first.t").fetchall() == [(1,)]
+            databases = con.execute("SELECT database_name FROM duckdb_databases()").fetchall()
+        assert ("broken",) not in databases
+
+    def test_attached_sources_are_not_reattached(
+        self, source_service: SourceService, sample_duckdb_db: Path
+    ):
+        """Test that sources already on the pooled instance are skipped."""
+        source_service.attach_source(
+            name="other", source_type=SourceType.DUCKDB, config={"path": str(sample_duckdb_db)}
+        )
+        assert "other" in source_service._attached_names()
+
+        source_service._build_attach_sql = None  # any ATTACH would fail loudly
+        with source_service._connect_with_sources(["other"]) as con:
+            assert con.execute("SELECT x FROM other.t").fetchall() == [(1,)]
+        del source_service._build_attach_sql
+
+        source_service.detach_source("other")
+        assert "other" not in source_service._attached_names()
+
+    def test_attach_path_with_quote(self, source_service: SourceService, tmp_path: Path):
+        """Test that quotes in a path cannot break out of the ATTACH literal."""
+        folder = tmp_path / "it's here"
+        folder.mkdir()
+        other_db = folder / "other.duckdb"
+        with duckdb.connect(str(other_db)) as con:
+            con.execute("CREATE TABLE t AS SELECT 1 AS x")
+
+        source_service.attach_source(
+            name="quoted",
+            source_type=SourceType.DUCKDB,
+            config={"path": str(other_db)},
+        )
+
+        with source_service._connect_with_sources(["quoted"]) as con:
+            assert con.execute("SELECT x FROM quoted.t").fetchall() == [(1,)]
+
+    def test_source_table_counts(
+        self, source_service: SourceService, sample_duckdb_db: Path
+    ):
+        """Test that every lookup reports the number of cached tables."""
+        source = source_service.attach_source(
+            name="other",
+            source_type=SourceType.DUCKDB,
+            config={"path": str(sample_duckdb_db)},
+        )
+        source_service.cache_table("other", "t")
+
+        assert source_service.list_sources()[0].table_count == 1
+        assert source_service.get_source("other").table_count == 1
+        assert source_service.get_source_by_id(source.id).table_count == 1
+
+    def test_stored_config_parse_is_reused(self, source_service: SourceService):
+        """Test that re-attach reuses the parsed stored config until it changes."""
+        first = source_service._parse_stored_config("db", '{"path": "/a.db"}')
+        assert source_service._parse_stored_config("db", '{"path": "/a.db"}') is first
+
+        changed = source_service._parse_stored_config("db", '{"path": "/b.db"}')
+        assert changed == {"path": "/b.db"}
+
+        source_service._forget_parsed_config("db")
+        assert source_service._parse_stored_config("db", '{"path": "/b.db"}') is not changed
+
+
 class TestListSourceTables:
     """Test listing tables from attached sources."""
 
@@ -186,6 +370,36 @@ class TestListSourceTables:
         # SQLite should have users and orders tables
         assert "users" in table_names or any("users" in t.table_name for t in tables)
 
+    def test_list_tables_marks_cached(
+        self, source_service: SourceService, sample_duckdb_db: Path
+    ):
+        """Test that cached tables are reported with their local table."""
+        with duckdb.connect(str(sample_duckdb_db)) as con:
+            con.execute("CREATE TABLE u AS SELECT 2 AS y")
+        source_service.attach_source(
+            name="other",
+            source_type=SourceType.DUCKDB,
+            config={"path": str(sample_duckdb_db)},
+        )
+        source_service.cache_table("other", "t", local_table="cached_t")
+
+        tables = {t.table_name: t for t in source_service.list_source_tables("other")}
+
+        assert tables["t"].mode == TableMode.CACHED
+        assert tables["t"].local_table == "cached_t"
+        assert tables["u"].mode == TableMode.LIVE
+        assert tables["u"].local_table is None
+
+    def test_list_tables_of_empty_database(self, source_service: SourceService, tmp_path: Path):
+        """Test that an empty DuckDB source lists no tables."""
+        empty_db = tmp_path / "empty.duckdb"
+        duckdb.connect(str(empty_db)).close()
+        source_service.attach_source(
+            name="empty", source_type=SourceType.DUCKDB, config={"path": str(empty_db)}
+        )
+
+        assert source_service.list_source_tables("empty") == []
+
     def test_list_tables_nonexistent_source(self, source_service: SourceService):
         """Test error when listing tables from non-existent source."""
         with pytest.raises(SourceNotFoundError):
@@ -418,3 +632,210 @@ class TestCleanupExpired:
         # Cache should be gone
         assert source_service.get_cached_table("src_users") is None
 
+    def test_drop_cache_removes_table(
+        self, source_service: SourceService, sample_duckdb_db: Path
+    ):
+        """Test dropping a cache removes its table and metadata once."""
+        source_service.attach_source(
+            name="other",
+            source_type=SourceType.DUCKDB,
+            config={"path": str(sample_duckdb_db)},
+        )
+        source_service.cache_table("other", "t", local_table="cached_t")
+
+        assert source_service.drop_cache("cached_t") is True
+        assert source_service.drop_cache("cached_t") is False
+        with source_service._connect() as con:
+            tables = con.execute(
+                "SELECT table_name FROM duckdb_tables() WHERE schema_name = 'cache'"
+            ).fetchall()
+        assert tables == []
+
+    def test_preview_uses_stored_row_count(
+        self, source_service: SourceService, sample_duckdb_db: Path
+    ):
+        """Test that previews report the row count recorded at cache time."""
+        source_service.attach_source(
+            name="other",
+            source_type=SourceType.DUCKDB,
+            config={"path": str(sample_duckdb_db)},
+        )
+        source_service.cache_table("other", "t", local_table="cached_t")
+
+        preview = source_service.preview_cached_table("cached_t", limit=10)
+
+        assert preview == {"columns": ["x"], "rows": [[1]], "total_rows": 1}
+
+    def test_cleanup_keeps_unexpired_caches(
+        self, source_service: SourceService, sample_duckdb_db: Path
+    ):
+        """Test that only expired caches and their tables are removed."""
+        source_service.attach_source(
+            name="other",
+            source_type=SourceType.DUCKDB,
+            config={"path": str(sample_duckdb_db)},
+        )
+        source_service.cache_table("other", "t", local_table="old_t", expires_hours=1)
+        source_service.cache_table("other", "t", local_table="new_t", expires_hours=1)
+        with source_service._connect() as con:
+            con.execute(
+                """
+                UPDATE _sources.cached_tables
+                SET expires_at = TIMESTAMP '2020-01-01 00:00:00'
+                WHERE local_table = 'old_t'
+                """
+            )
+
+        assert source_service.cleanup_expired_caches() == 1
+
+        assert [t.local_table for t in source_service.list_cached_tables()] == ["new_t"]
+        with source_service._connect() as con:
+            tables = con.execute(
+                "SELECT table_name FROM duckdb_tables() WHERE schema_name = 'cache'"
+            ).fetchall()
+        assert tables == [("new_t",)]
+
+
+class TestFolderSources:
+    """Test folder source creation."""
+
+    def test_create_folder_source(self, source_service: SourceService, tmp_path: Path):
+        folder = tmp_path / "data"
+        folder.mkdir()
+
+        source = source_service.create_folder_source(name="local", path=f"'{folder}'")
+
+        assert source.name == "local"
+        assert source.path == str(folder)
+        assert source.allowed_types == "both"
+
+    def test_create_folder_source_upserts_by_name(
+        self, source_service: SourceService, tmp_path: Path
+    ):
+        first = tmp_path / "first"
+        second = tmp_path / "second"
+        first.mkdir()
+        second.mkdir()
+
+        created = source_service.create_folder_source(name="local", path=str(first))
+        updated = source_service.create_folder_source(
+            name="local", path=str(second), allowed_types="csv"
+        )
+
+        assert updated.id == created.id
+        assert updated.path == str(second)
+        assert updated.allowed_types == "csv"
+        assert updated.updated_at is not None
+        assert len(source_service.list_folder_sources()) == 1
+
+    def test_create_folder_source_missing(self, source_service: SourceService, tmp_path: Path):
+        with pytest.raises(ValueError, match="Folder not found"):
+            source_service.create_folder_source(name="local", path=str(tmp_path / "missing"))
+
+    def test_create_folder_source_not_directory(
+        self, source_service: SourceService, tmp_path: Path
+    ):
+        file_path = tmp_path / "data.csv"
+        file_path.write_text("a\n1\n")
+
+        with pytest.raises(ValueError, match="not a directory"):
+            source_service.create_folder_source(name="local", path=str(file_path))
+
+    def test_delete_folder_source(self, source_service: SourceService, tmp_path: Path):
+        folder = tmp_path / "data"
+        folder.mkdir()
+        source = source_service.create_folder_source(name="local", path=str(folder))
+
+        assert source_service.delete_folder_source(source.id) is True
+        assert source_service.delete_folder_source(source.id) is False
+        assert source_service.list_folder_sources() == []
+
+    def test_list_folder_files_with_pattern(self, source_service: SourceService, tmp_path: Path):
+        folder = tmp_path / "data"
+        folder.mkdir()
+        for name in ("sales_2024.csv", "sales_2025.parquet", "users.csv", "notes.txt"):
+            (folder / name).write_text("a\n1\n")
+
+        source = source_service.create_folder_source(
+            name="local", path=str(folder), pattern="sales_*"
+        )
+        files = source_service.list_folder_files(source.id)
+
+        assert sorted(f.name for f in files) == ["sales_2024.csv", "sales_2025.parquet"]
+
+    def test_list_folder_files_after_folder_removed(
+        self, source_service: SourceService, tmp_path: Path
+    ):
+        folder = tmp_path / "data"
+        folder.mkdir()
+        (folder / "a.csv").write_text("a\n1\n")
+        source = source_service.create_folder_source(name="local", path=str(folder))
+        [listed] = source_service.list_folder_files(source.id)
+        assert listed.path == str(folder / "a.csv")
+        assert listed.size_bytes == 4
+
+        (folder / "a.csv").unlink()
+        folder.rmdir()
+
+        assert source_service.list_folder_files(source.id) == []
+
+    def test_list_folder_files_returns_newest(
+        self, source_service: SourceService, tmp_path: Path
+    ):
+        folder = tmp_path / "data"
+        folder.mkdir()
+        for index in range(5):
+            path = folder / f"f{index}.csv"
+            path.write_text("a\n1\n")
+            os.utime(path, (1_700_000_000 + index, 1_700_000_000 + index))
+        source = source_service.create_folder_source(name="local", path=str(folder))
+
+        files = source_service.list_folder_files(source.id, limit=2)
+
+        assert [f.name for f in files] == ["f4.csv", "f3.csv"]
+
+    def test_scan_folder_source_diffs_snapshots(
+        self, source_service: SourceService, tmp_path: Path
+    ):
+        folder = tmp_path / "data"
+        folder.mkdir()
+        for name in ("keep.csv", "change.csv", "drop.csv"):
+            (folder / name).write_text("a\n1\n")
+        source = source_service.create_folder_source(name="local", path=str(folder))
+
+        first = source_service.scan_folder_source(source.id)
+        assert (first.new_files, first.changed_files, first.deleted_files) == (3, 0, 0)
+
+        (folder / "change.csv").write_text("a\n1\n2\n")
+        (folder / "drop.csv").unlink()
+        (folder / "add.csv").write_text("a\n1\n")
+
+        second = source_service.scan_folder_source(source.id)
+        assert (second.new_files, second.changed_files, second.deleted_files) == (1, 1, 1)
+
+    def test_scan_folder_source_migrates_json_snapshot(
+        self, source_service: SourceService, tmp_path: Path
+    ):
+        folder = tmp_path / "data"
+        folder.mkdir()
+        (folder / "a.csv").write_text("a\n1\n")
+        source = source_service.create_folder_source(name="local", path=str(folder))
+        [listed] = source_service.list_folder_files(source.id)
+        legacy = [
+            {
+                "path": listed.path,
+                "size_bytes": listed.size_bytes,
+                "modified_at": listed.modified_at.isoformat(),
+            }
+        ]
+        with source_service._connect() as con:
+            con.execute(
+                "UPDATE _sources.folders SET last_scan_snapshot = ? WHERE id = ?",
+                [json.dumps(legacy), source.id],
+            )
+        reset_source_metadata()
+        SourceService("test_project", source_service.warehouse_path)
+
+        result = source_service.scan_folder_source(source.id)
+
+        assert (result.new_files, result.changed_files, result.deleted_files) == (0, 0, 0)